@@ -0,0 +1,176 @@
+"""
+Cohort analytics over results and autonomous results, computed as vectorized pandas group-bys.
+
+Best attempt per (htno, subcode) follows the CGPA rules used everywhere else:
+the earliest passing attempt, or the first attempt when none passed.
+"""
+import numpy as np
+import pandas as pd
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+
+from cgpa import FAILED_GRADES, UPPER_GRADE_POINTS
+from models import AutonomousResult, Result
+
+# source orders results before autonomous results, as in the CGPA kernel
+COLUMNS = ["source", "id", "htno", "subcode", "subname", "grade", "credits", "semester"]
+
+
+def _filtered(stmt, model, year, semester, start_htno, end_htno):
+    if year is not None:
+        stmt = stmt.where(model.year == year)
+    if semester is not None:
+        stmt = stmt.where(model.semester == semester)
+    if start_htno is not None and end_htno is not None:
+        stmt = stmt.where(model.htno.between(start_htno, end_htno))
+    return stmt
+
+
+def load_frame(db: Session, year=None, semester=None, start_htno=None, end_htno=None):
+    results = _filtered(select(
+        literal(0).label("source"), Result.id, Result.htno, Result.subcode, Result.subname,
+        Result.grade, Result.credits, Result.semester,
+    ), Result, year, semester, start_htno, end_htno)
+    # Legacy autonomous rows without a semester stay out, as in the CGPA kernel
+    autonomous = _filtered(select(
+        literal(1).label("source"), AutonomousResult.id, AutonomousResult.htno, AutonomousResult.subcode,
+        AutonomousResult.subname, AutonomousResult.grade, AutonomousResult.credits, AutonomousResult.semester,
+    ).where(AutonomousResult.semester.is_not(None)), AutonomousResult, year, semester, start_htno, end_htno)
+    # The DBAPI cursor's plain tuples go straight to pandas, skipping SQLAlchemy Row objects
+    result = db.connection().execute(union_all(results, autonomous))
+    try:
+        return pd.DataFrame.from_records(result.cursor.fetchall(), columns=COLUMNS)
+    finally:
+        result.close()
+
+
+def _normalized_grades(grades: pd.Series) -> pd.Series:
+    # A handful of distinct grades repeat across every row; clean each once
+    codes, uniques = pd.factorize(grades.fillna(""))
+    cleaned = np.array([grade.strip().upper() for grade in uniques] + [""], dtype=object)
+    return pd.Series(cleaned[codes], index=grades.index)
+
+
+def best_attempts(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.assign(
+        grade=_normalized_grades(frame["grade"]),
+        credits=frame["credits"].fillna(0.0).astype(float),
+    )
+    frame["failed"] = frame["grade"].isin(FAILED_GRADES)
+    # Sort on integer codes (sorted factorize keeps string order), then keep
+    # the first row of each (htno, subcode) run
+    htnos = pd.factorize(frame["htno"], sort=True)[0]
+    subcodes = pd.factorize(frame["subcode"], sort=True)[0]
+    order = np.lexsort((frame["id"].to_numpy(), frame["source"].to_numpy(), frame["failed"].to_numpy(),
+                        subcodes, htnos))
+    htnos, subcodes = htnos[order], subcodes[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (htnos[1:] != htnos[:-1]) | (subcodes[1:] != subcodes[:-1])
+    best = frame.take(order[first])
+    best["points"] = best["grade"].map(UPPER_GRADE_POINTS).fillna(0).astype(float)
+    best["earned_credits"] = np.where(best["failed"], 0.0, best["credits"])
+    best["earned_points"] = best["earned_credits"] * best["points"]
+    return best
+
+
+def _gpa(points: pd.Series, credits: pd.Series) -> pd.Series:
+    ratio = (points / credits.where(credits > 0)).fillna(0.0)
+    # Python's round() so values match the summary table and /calculate_cgpa.
+    # numpy rounds ratio * 100, which differs from it only when that product
+    # lands within float error of a half; those few are redone with round()
+    rounded = ratio.round(2)
+    near_half = (ratio * 100 % 1 - 0.5).abs() < 1e-6
+    rounded[near_half] = [round(value, 2) for value in ratio[near_half]]
+    return rounded
+
+
+def student_stats(best: pd.DataFrame) -> pd.DataFrame:
+    grouped = best.groupby("htno", sort=True).agg(
+        credits=("earned_credits", "sum"),
+        points=("earned_points", "sum"),
+        backlogs=("failed", "sum"),
+    )
+    grouped["cgpa"] = _gpa(grouped["points"], grouped["credits"])
+    grouped["backlogs"] = grouped["backlogs"].astype(int)
+    return grouped
+
+
+def semester_stats(best: pd.DataFrame) -> pd.DataFrame:
+    grouped = best.groupby(["htno", "semester"], sort=True).agg(
+        credits=("earned_credits", "sum"),
+        points=("earned_points", "sum"),
+        backlogs=("failed", "sum"),
+    )
+    grouped["sgpa"] = _gpa(grouped["points"], grouped["credits"])
+    grouped["backlogs"] = grouped["backlogs"].astype(int)
+    return grouped
+
+
+def subject_stats(best: pd.DataFrame) -> pd.DataFrame:
+    grouped = best.groupby("subcode", sort=True).agg(
+        subname=("subname", "first"),
+        students=("htno", "size"),
+        failed=("failed", "sum"),
+        mean_grade_points=("points", "mean"),
+    )
+    grouped["passed"] = grouped["students"] - grouped["failed"]
+    grouped["pass_rate"] = (grouped["passed"] / grouped["students"]).round(4)
+    grouped["mean_grade_points"] = grouped["mean_grade_points"].round(2)
+    distribution = pd.crosstab(best["subcode"], best["grade"])
+    return grouped, distribution
+
+
+def cohort_report(frame: pd.DataFrame, top: int = 10):
+    if frame.empty:
+        return {"rows": 0, "students": 0, "pass_rate": 0.0, "subjects": [], "toppers": []}
+
+    best = best_attempts(frame)
+    students = student_stats(best)
+    subjects, distribution = subject_stats(best)
+
+    # Toppers are ranked among students who cleared every subject
+    toppers = (
+        students[students["backlogs"] == 0].reset_index()
+        .sort_values(["cgpa", "htno"], ascending=[False, True])
+        .head(top)
+    )
+
+    return {
+        "rows": int(len(frame)),
+        "students": int(len(students)),
+        "pass_rate": round(float((students["backlogs"] == 0).mean()), 4),
+        "subjects": [
+            {
+                "subcode": subcode,
+                "subname": row.subname or "",
+                "students": int(row.students),
+                "passed": int(row.passed),
+                "pass_rate": float(row.pass_rate),
+                "mean_grade_points": float(row.mean_grade_points),
+                "grade_distribution": {
+                    grade: int(count)
+                    for grade, count in distribution.loc[subcode].items() if count
+                },
+            }
+            for subcode, row in subjects.iterrows()
+        ],
+        "toppers": [
+            {"htno": row.htno, "cgpa": float(row.cgpa), "backlogs": int(row.backlogs)}
+            for row in toppers.itertuples()
+        ],
+    }
+
+
+def sgpa_report(frame: pd.DataFrame):
+    if frame.empty:
+        return []
+    semesters = semester_stats(best_attempts(frame)).reset_index()
+    return [
+        {
+            "htno": row.htno,
+            "semester": int(row.semester),
+            "sgpa": float(row.sgpa),
+            "backlogs": int(row.backlogs),
+        }
+        for row in semesters.itertuples()
+    ]
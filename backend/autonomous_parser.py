@@ -0,0 +1,160 @@
+"""
+Autonomous result PDFs: grade sheets published by the college itself.
+
+Their layouts vary between colleges and regulations, so columns are located by
+header text instead of position: HTNO, subject code and grade are required,
+subject name and credits are optional. A page whose table has no header row
+reuses the columns of the previous page.
+
+Parsed rows are collected first, then written to autonomous_results in
+WRITE_CHUNK batches keyed on (htno, subcode, semester, year); touched
+students' CGPA summaries are refreshed once at the end, in the same
+transaction.
+"""
+import logging
+import os
+import re
+
+from sqlalchemy.orm import Session
+
+import metrics
+import pdf_parser
+import summary
+from database import upsert_chunk
+from models import AutonomousResult
+
+logger = logging.getLogger(__name__)
+
+# What to do when (htno, subcode) is already stored for the exam: "upsert" or "skip"
+ON_CONFLICT = os.getenv("AUTONOMOUS_ON_CONFLICT", "upsert")
+WRITE_CHUNK = 1000
+# Rows are matched within one exam on UPSERT_KEY; UPSERT_VALUES are compared and rewritten
+UPSERT_KEY = ("htno", "subcode")
+UPSERT_VALUES = ("subname", "grade", "credits")
+
+# Header cells are compared lower-cased with everything but letters stripped
+HEADER_ALIASES = {
+    "htno": ("htno", "hallticketno", "hallticketnumber", "rollno", "regdno", "registerno"),
+    "subcode": ("subcode", "subjectcode", "coursecode"),
+    "subname": ("subname", "subjectname", "coursename", "coursetitle", "subject"),
+    "grade": ("grade", "grades", "gradesecured", "gradeawarded"),
+    "credits": ("credits", "credit", "creditsobtained", "creditsearned"),
+}
+REQUIRED_COLUMNS = ("htno", "subcode", "grade")
+_ALIAS_COLUMN = {alias: column for column, aliases in HEADER_ALIASES.items() for alias in aliases}
+_NON_LETTERS_RE = re.compile(r"[^a-z]")
+
+
+def header_columns(row):
+    """{column: cell index} when row is a header naming every required column, else None."""
+    columns = {}
+    for index, cell in enumerate(row):
+        column = _ALIAS_COLUMN.get(_NON_LETTERS_RE.sub("", (cell or "").lower()))
+        if column and column not in columns:
+            columns[column] = index
+    if all(column in columns for column in REQUIRED_COLUMNS):
+        return columns
+    return None
+
+
+def normalize_row(row, columns):
+    """(htno, subcode, subname, grade, credits) or None; credits is None when not published."""
+    def cell(column):
+        index = columns.get(column)
+        if index is None or index >= len(row) or row[index] is None:
+            return ""
+        return row[index].strip()
+
+    htno, subcode, grade = cell("htno"), cell("subcode"), cell("grade")
+    if not htno or not subcode or not grade:
+        return None
+
+    credits = cell("credits")
+    try:
+        credits = float(credits) if credits else None
+    except ValueError:
+        logger.warning("Skipping autonomous row with invalid credits %r: %s", credits, row)
+        return None
+    return htno, subcode, " ".join(cell("subname").split()), grade.upper(), credits
+
+
+def parse_autonomous_pdf(source, backend: str = None, on_pages=None, stats: dict = None):
+    """
+    Yield (htno, subcode, subname, grade, credits) rows in page order.
+    source may also be raw PDF bytes. Tables are read with the same extraction
+    backends as result PDFs (see pdf_parser.get_backend).
+    """
+    if stats is None:
+        stats = {}
+    stats.update(pages=0, rows=0, skipped=0, headerless_pages=0)
+    backend = pdf_parser.get_backend(backend)
+    columns = None
+
+    with backend.open(source) as doc:
+        total_pages = backend.page_count(doc)
+        for index in range(total_pages):
+            with metrics.span("extract_page"):
+                table = backend.page_table(doc, index) or []
+            stats["pages"] += 1
+
+            with metrics.span("normalize_rows"):
+                rows = []
+                for row in table:
+                    header = header_columns(row)
+                    if header:
+                        columns = header
+                        continue
+                    if columns is None:
+                        stats["skipped"] += 1
+                        continue
+                    parsed = normalize_row(row, columns)
+                    if parsed:
+                        rows.append(parsed)
+                    else:
+                        stats["skipped"] += 1
+            if table and columns is None:
+                stats["headerless_pages"] += 1
+
+            stats["rows"] += len(rows)
+            yield from rows
+            if on_pages:
+                on_pages(index + 1, total_pages)
+
+    logger.info(
+        "Parsed autonomous PDF: %d pages, %d rows, %d rows skipped, %d pages before any header",
+        stats["pages"], stats["rows"], stats["skipped"], stats["headerless_pages"],
+    )
+
+
+def exam_filter(year: int, semester: int):
+    return (AutonomousResult.semester == semester, AutonomousResult.year == year)
+
+
+def store_autonomous_results(rows, year: int, semester: int, db: Session, on_conflict: str = ON_CONFLICT):
+    """
+    Write parsed rows in WRITE_CHUNK batches, then refresh the CGPA summaries of
+    every student whose grades changed; the caller commits. Rows are collected
+    before the first write, as in store_rows(), so a parse_autonomous_pdf()
+    generator never runs inside the write transaction.
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    touched = set()
+    rows = list(rows)
+    for start in range(0, len(rows), WRITE_CHUNK):
+        chunk = rows[start:start + WRITE_CHUNK]
+        written = upsert_chunk(
+            db, AutonomousResult,
+            [
+                {"htno": htno, "subcode": subcode, "subname": subname, "grade": grade,
+                 "credits": credits, "semester": semester, "year": year}
+                for htno, subcode, subname, grade, credits in chunk
+            ],
+            UPSERT_KEY, UPSERT_VALUES, on_conflict, counts, where=exam_filter(year, semester),
+        )
+        touched.update(row["htno"] for row in written)
+
+    if touched:
+        with metrics.span("summary_refresh"):
+            summary.refresh_students(db, touched)
+    counts["unique_students"] = len(touched)
+    return counts
@@ -0,0 +1,56 @@
+"""
+Cohort analytics throughput on a synthetic results table.
+
+Run from backend/:  python -m benchmarks.bench_analytics --students 10000 --subjects 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import analytics
+import models
+from benchmarks.synthetic import synthetic_rows
+from pdf_parser import store_rows
+
+
+def timed(label, fn, rows):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms   {rows / elapsed:>12,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--subjects", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.students, args.subjects)
+    print(f"{len(rows):,} result rows, {args.students:,} students")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        store_rows(rows, 2024, 1, "Regular", db)
+        db.commit()
+
+        frame = timed("load_frame (SQLite)", lambda: analytics.load_frame(db, 2024, 1), len(rows))
+        best = timed("best_attempts", lambda: analytics.best_attempts(frame), len(rows))
+        timed("student_stats (CGPA)", lambda: analytics.student_stats(best), len(rows))
+        timed("semester_stats (SGPA)", lambda: analytics.semester_stats(best), len(rows))
+        timed("subject_stats", lambda: analytics.subject_stats(best), len(rows))
+        timed("cohort_report (end to end)", lambda: analytics.cohort_report(frame), len(rows))
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Section lookups: one /get_results/batch call vs. N /get_result/{htno} calls.
+
+For each section size, fetches the same students as N single calls (one at a
+time, and --concurrency in flight) with the result cache cleared, then as one
+batch request in JSON and MessagePack, with and without internal marks.
+Everything runs in-process over httpx's ASGI transport against a throwaway
+SQLite file.
+
+Run from backend/:  python -m benchmarks.bench_batch_lookup --students 3000 --sections 60 250 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench-batch-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}")
+
+import httpx
+
+import database
+import main
+import migrations
+import result_cache
+from benchmarks import synthetic
+from internal_parser import store_internal_marks
+
+
+async def singles(client, htnos, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+    sizes = []
+
+    async def one(htno):
+        async with limit:
+            response = await client.get(f"/get_result/{htno}")
+            response.raise_for_status()
+            sizes.append(len(response.content))
+
+    await asyncio.gather(*(one(htno) for htno in htnos))
+    return sum(sizes)
+
+
+async def batch(client, htnos, fmt, internals):
+    response = await client.post(
+        f"/get_results/batch?format={fmt}",
+        json={"htnos": htnos, "include_internals": internals},
+    )
+    response.raise_for_status()
+    return len(response.content)
+
+
+async def timed(runs, fn, *args):
+    """Median wall time (s) over runs, plus the response bytes of the last one."""
+    samples = []
+    for _ in range(runs):
+        result_cache.clear()
+        start = time.perf_counter()
+        size = await fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), size
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--sections", type=int, nargs="+", default=[60, 250, 500])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    migrations.migrate(database.engine)
+    db = database.SessionLocal()
+    synthetic.populate(db, args.students, args.subjects, semesters=2)
+    store_internal_marks((
+        {**record, "htno": f"24B81A{int(record['htno'][2:]):04d}"}
+        for record in synthetic.internal_records(args.students, args.subjects)
+    ), db)
+    db.commit()
+    db.close()
+
+    htnos = [f"24B81A{s:04d}" for s in range(args.students)]
+    rnd = random.Random(1)
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in args.sections:
+                section = sorted(rnd.sample(htnos, min(size, len(htnos))))
+                variants = [
+                    ("single x N, serial", singles, client, section, 1),
+                    (f"single x N, {args.concurrency} in flight", singles, client, section, args.concurrency),
+                    ("batch json", batch, client, section, "json", False),
+                    ("batch msgpack", batch, client, section, "msgpack", False),
+                    ("batch json + internals", batch, client, section, "json", True),
+                    ("batch msgpack + internals", batch, client, section, "msgpack", True),
+                ]
+                print(f"📦 section of {len(section)} students")
+                baseline = None
+                for label, fn, *fn_args in variants:
+                    elapsed, nbytes = await timed(args.runs, fn, *fn_args)
+                    baseline = baseline or elapsed
+                    print(f"  {label:<28} {elapsed * 1000:8.1f} ms  {len(section) / elapsed:9,.0f} students/s  "
+                          f"{nbytes / 1024:8.1f} KiB  x{baseline / elapsed:5.1f}")
+        await database.async_read_engine.dispose()
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        database.engine.dispose()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_()
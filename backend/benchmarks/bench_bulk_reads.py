@@ -0,0 +1,93 @@
+"""
+Bulk result reads: full ORM entities vs. projected columns vs. streamed
+Core rows, each feeding the CGPA kernel. Reports wall time and the peak
+Python heap (tracemalloc, measured in a separate pass so it doesn't skew timings).
+
+Run from backend/:  python -m benchmarks.bench_bulk_reads --students 50000 --subjects 10
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import cgpa
+import models
+from benchmarks.synthetic import synthetic_rows
+from database import stream_rows
+from models import Result
+from pdf_parser import store_rows
+from summary import KERNEL_COLUMNS
+
+
+def orm_entities(db):
+    results = db.query(Result).order_by(Result.id).all()
+    return cgpa.aggregate((r.htno, r.subcode, r.grade, r.credits, r.semester) for r in results)
+
+
+def orm_columns(db):
+    return cgpa.aggregate(db.execute(KERNEL_COLUMNS.order_by(Result.id)).all())
+
+
+def streamed_rows(db):
+    return cgpa.aggregate(stream_rows(db, KERNEL_COLUMNS.order_by(Result.id)))
+
+
+def measure(Session, fn):
+    db = Session()
+    try:
+        gc.collect()
+        start = time.perf_counter()
+        students = len(fn(db))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    db = Session()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        fn(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return students, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--subjects", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.students, args.subjects)
+    print(f"{len(rows):,} result rows, {args.students:,} students")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        db = Session()
+        store_rows(rows, 2024, 1, "Regular", db)
+        db.commit()
+        db.close()
+        del rows
+
+        for label, fn in (
+            ("ORM entities", orm_entities),
+            ("ORM column select", orm_columns),
+            ("stream_rows (Core)", streamed_rows),
+        ):
+            students, elapsed, peak = measure(Session, fn)
+            print(f"{label:<20} {elapsed:6.2f} s   peak heap {peak / 2**20:8.1f} MiB   "
+                  f"({students:,} students)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
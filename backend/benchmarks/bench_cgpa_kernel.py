@@ -0,0 +1,76 @@
+"""
+Microbenchmark: the original per-endpoint CGPA loop over ORM entities vs.
+the shared cgpa kernel over compact tuples.
+
+Run from backend/:  python -m benchmarks.bench_cgpa_kernel --students 20000
+"""
+import argparse
+import random
+import time
+
+import cgpa
+from models import Result
+from utils import GRADE_POINTS
+
+GRADES = ["S", "A", "B", "C", "D", "E", "F", "Ab"]
+
+
+def legacy_loop(results):
+    """The loop /calculate_cgpa used to run per request."""
+    student_data = {}
+    for res in results:
+        if res.htno not in student_data:
+            student_data[res.htno] = {}
+        if res.subcode not in student_data[res.htno]:
+            student_data[res.htno][res.subcode] = res
+        else:
+            prev = student_data[res.htno][res.subcode]
+            if prev.grade.upper() in ("F", "AB") and res.grade.upper() not in ("F", "AB"):
+                student_data[res.htno][res.subcode] = res
+
+    report = []
+    for htno, subjects in student_data.items():
+        total_credits = 0.0
+        total_points = 0.0
+        backlogs = 0
+        for result in subjects.values():
+            grade = result.grade.upper()
+            if grade in ("F", "AB"):
+                backlogs += 1
+                continue
+            total_credits += result.credits
+            total_points += result.credits * GRADE_POINTS.get(grade, 0)
+        cgpa_value = round(total_points / total_credits, 2) if total_credits else 0.0
+        report.append((htno, cgpa_value, backlogs))
+    return report
+
+
+def kernel(rows):
+    return [(htno, s.cgpa, s.backlogs) for htno, s in cgpa.aggregate(rows).items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--subjects", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = random.Random(5)
+    rows = [
+        (f"24B81A{s:05d}", f"24CS11{j:02d}", rnd.choice(GRADES), 3.0, 1)
+        for s in range(args.students) for j in range(args.subjects)
+    ]
+    entities = [
+        Result(htno=h, subcode=c, grade=g, credits=cr, semester=sem) for h, c, g, cr, sem in rows
+    ]
+
+    for label, fn, data in (("legacy ORM loop", legacy_loop, entities), ("cgpa kernel", kernel, rows)):
+        start = time.perf_counter()
+        report = fn(data)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16} {elapsed * 1000:8.1f} ms  {len(rows) / elapsed:>12,.0f} rows/s  "
+              f"({len(report)} students)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Worker cold start: wall time for a fresh interpreter to `import main`, the
+slowest modules it pulls in (-X importtime), which heavy libraries got loaded,
+and time to the first /get_result response with the lifespan startup included.
+
+Run from backend/:  python -m benchmarks.bench_import_time --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "pdfplumber", "pdfminer", "fitz", "pymupdf", "PIL.Image")
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+FIRST_REQUEST_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get("/get_result/0000000000")
+    print(json.dumps({"first_request_ms": (time.perf_counter() - start) * 1000}))
+"""
+
+
+def _run(script: str, *flags, migrate_on_startup: bool = True):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PYTHONPATH=BACKEND_DIR,
+            PYTHONWARNINGS="ignore",
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'cold.db')}",
+            MIGRATE_ON_STARTUP="1" if migrate_on_startup else "0",
+        )
+        os.makedirs(os.path.join(tmp, "uploads", "notifications"))
+        proc = subprocess.run(
+            [sys.executable, *flags, "-c", script],
+            cwd=tmp, env=env, capture_output=True, text=True, check=True,
+        )
+    return proc
+
+
+def import_main_ms(runs: int):
+    samples = [json.loads(_run(IMPORT_SCRIPT).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return [s["import_ms"] for s in samples], samples[-1]["heavy"]
+
+
+def first_request_ms(runs: int):
+    return [
+        json.loads(_run(FIRST_REQUEST_SCRIPT).stdout.strip().splitlines()[-1])["first_request_ms"]
+        for _ in range(runs)
+    ]
+
+
+def slowest_imports(top: int):
+    """(cumulative_us, module) for modules imported directly by main."""
+    stderr = _run("import main", "-X", "importtime").stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # After the separator space, main's direct imports are indented by two
+        name = name[1:]
+        if name.startswith("   ") or not name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        entries.append((int(cumulative), name.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    samples, heavy = import_main_ms(args.runs)
+    print(f"import main         median {statistics.median(samples):7.1f} ms   "
+          f"min {min(samples):7.1f} ms   ({args.runs} runs)")
+    samples = first_request_ms(args.runs)
+    print(f"first /get_result   median {statistics.median(samples):7.1f} ms   "
+          f"min {min(samples):7.1f} ms   (fresh DB, migrate on startup)")
+    print(f"heavy libraries loaded by import: {', '.join(heavy) or 'none'}")
+    print("slowest direct imports of main:")
+    for cumulative, name in slowest_imports(args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,92 @@
+"""
+Ingestion throughput: row-at-a-time lookups vs. the bulk store path.
+
+Run from backend/:  python -m benchmarks.bench_ingest --students 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from benchmarks.synthetic import synthetic_rows
+from models import Result
+from pdf_parser import store_rows
+
+
+def legacy_store_rows(rows, year, semester, exam_type, db):
+    """The pre-bulk implementation: one or two queries per row."""
+    total_results = 0
+    unique_htnos = set()
+    for htno, subcode, subname, internals, grade, credits in rows:
+        if exam_type.lower() == "supply":
+            if grade != "F":
+                failed_regular = db.query(Result).filter(
+                    Result.htno == htno, Result.subcode == subcode,
+                    Result.semester == semester, Result.year == year,
+                    Result.exam_type == "Regular", Result.grade == "F"
+                ).first()
+                if failed_regular:
+                    failed_regular.grade = grade
+                    failed_regular.internals = internals
+                    failed_regular.credits = credits
+                    total_results += 1
+                    unique_htnos.add(htno)
+                    continue
+            exam_type = "Supply"
+
+        existing = db.query(Result).filter(
+            Result.htno == htno, Result.subcode == subcode,
+            Result.semester == semester, Result.year == year,
+            Result.exam_type == exam_type
+        ).first()
+        if existing:
+            continue
+
+        db.add(Result(htno=htno, subcode=subcode, subname=subname, internals=internals,
+                      grade=grade, credits=credits, semester=semester, year=year,
+                      exam_type=exam_type))
+        total_results += 1
+        unique_htnos.add(htno)
+    db.commit()
+    return {"total_results": total_results, "unique_students": len(unique_htnos)}
+
+
+def run(store, rows, label):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        timings = []
+        for exam_type in ("Regular", "Regular", "Supply"):
+            db = Session()
+            start = time.perf_counter()
+            stats = store(rows, 2024, 1, exam_type, db)
+            db.commit()
+            timings.append((exam_type, time.perf_counter() - start, stats["total_results"]))
+            db.close()
+        engine.dispose()
+
+    for exam_type, elapsed, stored in timings:
+        print(f"{label:>8} {exam_type:<8} {len(rows) / elapsed:>12,.0f} rows/s  "
+              f"({elapsed:.2f}s, {stored} stored)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--subjects", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.students, args.subjects)
+    print(f"{len(rows)} rows: fresh insert, re-upload (all duplicates), supply pass")
+    run(legacy_store_rows, rows, "legacy")
+    run(store_rows, rows, "bulk")
+
+
+if __name__ == "__main__":
+    main()
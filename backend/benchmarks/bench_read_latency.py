@@ -0,0 +1,127 @@
+"""
+Read-path load test: async endpoints vs. their threadpool (sync Session) equivalents.
+
+Both variants run in-process over httpx's ASGI transport against the same
+SQLite file, with unique HTNOs per request so the result cache never hits.
+
+Run from backend/:  python -m benchmarks.bench_read_latency --students 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench-read-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}")
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+import database
+import main
+import migrations
+from benchmarks.synthetic import synthetic_rows
+from models import Result
+from pdf_parser import store_rows
+
+
+def sync_app():
+    """Threadpool twins of the async read endpoints."""
+    app = FastAPI()
+
+    @app.get("/get_result/{htno}")
+    def get_result(htno: str, db: Session = Depends(database.get_read_db)):
+        results = db.query(Result).filter(Result.htno == htno).all()
+        if not results:
+            raise HTTPException(status_code=404, detail="Result not found")
+        adapter = main._results_adapter
+        return Response(
+            content=adapter.dump_json(adapter.validate_python(results, from_attributes=True)),
+            media_type="application/json",
+        )
+
+    @app.get("/calculate_cgpa")
+    def calculate_cgpa(start_htno: str = Query(...), end_htno: str = Query(...),
+                       db: Session = Depends(database.get_read_db)):
+        return {"report": [
+            {"htno": htno, "cgpa": cgpa, "backlogs": backlogs}
+            for htno, cgpa, backlogs in main._cgpa_rows(db, start_htno, end_htno, False)
+        ]}
+
+    return app
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def load(app, paths, concurrency):
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(path):
+            async with limit:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def report(label, latencies, elapsed):
+    print(f"{label:<22} {len(latencies) / elapsed:>8,.0f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    migrations.migrate(database.engine)
+    db = database.SessionLocal()
+    store_rows(synthetic_rows(args.students, 10), 2024, 1, "Regular", db)
+    db.commit()
+    db.close()
+
+    htnos = [f"24B81A{s:04d}" for s in range(args.students)]
+    rnd = random.Random(1)
+    rnd.shuffle(htnos)
+    half = len(htnos) // 2
+    ranges = [
+        f"/calculate_cgpa?start_htno={htnos[i]}&end_htno={htnos[i]}Z"
+        for i in range(0, len(htnos), 10)
+    ]
+
+    # One event loop for everything: the async engine's pool is bound to it
+    async def run_all():
+        for label, app, result_htnos in (("sync", sync_app(), htnos[:half]),
+                                         ("async", main.app, htnos[half:])):
+            latencies, elapsed = await load(
+                app, [f"/get_result/{htno}" for htno in result_htnos], args.concurrency
+            )
+            report(f"{label} /get_result", latencies, elapsed)
+            latencies, elapsed = await load(app, ranges, args.concurrency)
+            report(f"{label} /calculate_cgpa", latencies, elapsed)
+        await database.async_read_engine.dispose()
+
+    asyncio.run(run_all())
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_()
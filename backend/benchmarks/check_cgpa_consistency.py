@@ -0,0 +1,121 @@
+"""
+Property check: every CGPA path agrees on randomized result tables.
+
+Compares the cgpa kernel, the summary table behind /calculate_cgpa and
+/filter_cgpa_backlogs, the live SQL report (cgpa_sql.report directly and
+through the endpoints' helper), and the pandas analytics on data with repeated attempts, supply passes and mixed-case grades, plus
+autonomous results that share subject codes with results and legacy
+autonomous rows without a semester (which no path may count).
+
+Run from backend/:  python -m benchmarks.check_cgpa_consistency --cases 50
+"""
+import argparse
+import random
+import sys
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import analytics
+import cgpa_sql
+import migrations
+import summary
+from main import _cgpa_rows
+from models import AutonomousResult, Result
+
+GRADES = ["S", "A", "B", "C", "D", "E", "F", "f", "AB", "Ab", "ab", " A", "X"]
+
+
+def random_rows(rnd, students):
+    rows = []
+    for s in range(students):
+        htno = f"24B81A{s:04d}"
+        for j in range(rnd.randint(1, 8)):
+            subcode = f"24CS{j:04d}"
+            semester = rnd.randint(1, 3)
+            credits = rnd.choice([0.0, 1.5, 3.0, 4.0, None])
+            for attempt in range(rnd.randint(1, 3)):
+                rows.append({
+                    "htno": htno, "subcode": subcode, "subname": "s", "internals": 0,
+                    "grade": rnd.choice(GRADES), "credits": credits,
+                    "semester": semester, "year": 2024 + attempt,
+                    "exam_type": "Regular" if attempt == 0 else "Supply",
+                })
+    return rows
+
+
+def random_autonomous_rows(rnd, students):
+    rows = []
+    for s in range(students):
+        htno = f"24B81A{s:04d}"
+        # Codes from 24CS0004 up overlap random_rows(); the results attempt must stay first
+        for j in range(rnd.randint(0, 6)):
+            legacy = rnd.random() < 0.2
+            rows.append({
+                "htno": htno, "subcode": f"24CS{4 + j:04d}", "subname": "s",
+                "grade": rnd.choice(GRADES), "credits": None if legacy else rnd.choice([0.0, 3.0, None]),
+                "semester": None if legacy else rnd.randint(3, 4),
+                "year": None if legacy else 2026,
+            })
+    return rows
+
+
+def check_case(seed):
+    rnd = random.Random(seed)
+    engine = create_engine("sqlite://")
+    migrations.migrate(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    students = rnd.randint(1, 40)
+    db.execute(insert(Result), random_rows(rnd, students))
+    autonomous = random_autonomous_rows(rnd, students + 2)
+    if autonomous:
+        db.execute(insert(AutonomousResult), autonomous)
+    db.commit()
+    summary.rebuild(db)
+
+    start, end = "24B81A0000", "24B81A9999"
+    expected = list(_cgpa_rows(db, start, end, False))
+    problems = []
+    student_rows, _ = summary.summarize(summary.kernel_rows(db))
+    kernel = sorted((row["htno"], round(row["cgpa"], 2), row["backlogs"]) for row in student_rows)
+    if list(cgpa_sql.report(db, start, end)) != kernel:
+        problems.append("cgpa_sql.report differs from the cgpa kernel")
+    if list(_cgpa_rows(db, start, end, True)) != expected:
+        problems.append("live SQL report differs from summary")
+
+    students = analytics.student_stats(analytics.best_attempts(analytics.load_frame(db)))
+    frame_rows = [(htno, row.cgpa, row.backlogs) for htno, row in students.iterrows()]
+    if frame_rows != expected:
+        problems.append("pandas analytics differs from summary")
+
+    bounds = sorted(rnd.uniform(0, 10) for _ in range(2)) + sorted(rnd.randint(0, 6) for _ in range(2))
+    filtered = [
+        row for row in expected
+        if bounds[0] <= row[1] < bounds[1] and bounds[2] <= row[2] < bounds[3]
+    ]
+    for live in (False, True):
+        if list(_cgpa_rows(db, start, end, live, *bounds)) != filtered:
+            problems.append(f"filter (live={live}) differs for bounds {bounds}")
+
+    db.close()
+    engine.dispose()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    for seed in range(args.seed, args.seed + args.cases):
+        for problem in check_case(seed):
+            failures += 1
+            print(f"❌ seed {seed}: {problem}")
+    print(f"{'❌' if failures else '✅'} {args.cases} cases, {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Conformance and throughput of the result PDF extraction backends.
+
+Every backend must return the same raw page tables as pdfplumber on the
+sample upload in uploaded_pdfs/, and the same normalized rows as were
+rendered into synthetic 6- and 7-column PDFs. Exits 1 on any mismatch.
+
+Run from backend/:  python -m benchmarks.check_pdf_backends --students 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import pdf_parser
+from benchmarks import synthetic
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "uploaded_pdfs", "1st BTech 1st Sem (CR24) Results.pdf")
+REFERENCE = "pdfplumber"
+
+
+def page_tables(backend, source):
+    with backend.open(source) as doc:
+        return [backend.page_table(doc, index) for index in range(backend.page_count(doc))]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument("--sample", default=SAMPLE_PDF)
+    args = parser.parse_args()
+
+    failures = 0
+    reference = pdf_parser.BACKENDS[REFERENCE]
+    expected_tables, _ = timed(lambda: page_tables(reference, args.sample))
+    print(f"📄 {os.path.basename(args.sample)}: {len(expected_tables)} pages")
+
+    rows = synthetic.synthetic_rows(args.students, args.subjects)
+    synthetic_pdfs = {
+        "7-column": synthetic.result_pdf(rows, seven_columns=True),
+        "6-column": synthetic.result_pdf(rows, seven_columns=False),
+    }
+
+    for name, backend in pdf_parser.BACKENDS.items():
+        tables, elapsed = timed(lambda: page_tables(backend, args.sample))
+        mismatched = [i + 1 for i, (a, b) in enumerate(zip(tables, expected_tables)) if a != b]
+        if len(tables) != len(expected_tables) or mismatched:
+            failures += 1
+            print(f"❌ {name}: sample tables differ on pages {mismatched[:10]}")
+        print(f"{name:<11} sample  {len(tables) / elapsed:8.1f} pages/s")
+
+        for layout, pdf in synthetic_pdfs.items():
+            extracted, elapsed = timed(lambda: list(pdf_parser.extract_rows(pdf, workers=1, backend=name)))
+            if extracted != rows:
+                failures += 1
+                print(f"❌ {name}: {layout} rows differ ({len(extracted)} extracted, {len(rows)} expected)")
+            print(f"{name:<11} {layout}  {len(rows) / elapsed:8.1f} rows/s")
+
+    if failures:
+        sys.exit(1)
+    print(f"✅ {', '.join(pdf_parser.BACKENDS)} agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Process-pool safety checks for result PDF extraction.
+
+  * extraction through the pool finishes while another thread holds a lock
+    (the metrics histogram lock) at the moment workers start; forked workers
+    would inherit it locked and hang
+  * concurrent uploads share the one pool of PDF_WORKERS processes
+  * an /upload_pdf/ upload above PDF_PARALLEL_MIN_PAGES goes through the pool
+    even though it is small enough to be spooled in memory
+
+Run from backend/:  python -m benchmarks.check_pdf_pool   (exits non-zero on failure)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+TMP_DIR = tempfile.mkdtemp(prefix="check-pool-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'pool.db')}")
+os.environ.setdefault("PDF_WORKERS", "2")
+
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+import pdf_parser
+import spool
+from benchmarks import synthetic
+
+TIMEOUT = 120
+
+
+def extract_in_thread(path, results, key):
+    results[key] = list(pdf_parser.extract_rows(path, workers=2))
+
+
+def check_api_upload(rows, pdf):
+    """True when a job parsing an in-memory spooled upload started the pool."""
+    pdf_parser.shutdown_pool()
+    with TestClient(main.app) as client:
+        job = client.post(
+            "/upload_pdf/",
+            data={"year": 2024, "semester": 1, "exam_type": "Regular"},
+            files={"file": ("section.pdf", pdf, "application/pdf")},
+        ).json()
+        deadline = time.time() + TIMEOUT
+        while job["status"] in ("queued", "running") and time.time() < deadline:
+            time.sleep(0.2)
+            job = client.get(f"/jobs/{job['job_id']}").json()
+        # Checked before the lifespan shuts the pool down
+        used_pool = pdf_parser._pool is not None
+    ok = job["status"] == "done" and job["rows_inserted"] == len(rows) and used_pool
+    print(f"{'✅' if ok else '❌'} /upload_pdf/ of {job['total_pages']} pages, {len(pdf) / 1024:.0f} KiB "
+          f"(in memory below {spool.SPOOL_MEMORY_LIMIT // 1024} KiB): {job['status']}, "
+          f"{job['rows_inserted']} rows, pool {'used' if used_pool else 'NOT used'}")
+    return ok
+
+
+def main_():
+    rows = synthetic.synthetic_rows(300, 8)
+    failures = 0
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(synthetic.result_pdf(rows))
+        path = f.name
+
+    try:
+        # Hold the histogram lock while the pool's workers are being started
+        held = threading.Event()
+
+        def hold_lock():
+            with metrics.STAGE_SECONDS._lock:
+                held.set()
+                time.sleep(2)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        held.wait()
+        results = {}
+        worker = threading.Thread(target=extract_in_thread, args=(path, results, "locked"), daemon=True)
+        worker.start()
+        worker.join(TIMEOUT)
+        holder.join()
+        ok = not worker.is_alive() and results.get("locked") == rows
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} extraction with a lock held at worker start "
+              f"{'finished' if not worker.is_alive() else f'still running after {TIMEOUT}s'}")
+
+        threads = [
+            threading.Thread(target=extract_in_thread, args=(path, results, i), daemon=True)
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(TIMEOUT)
+        pool = pdf_parser._get_pool()
+        processes = len(pool._processes)
+        ok = all(results.get(i) == rows for i in range(3)) and processes <= pdf_parser.PDF_WORKERS
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} 3 concurrent extractions used {processes} worker processes "
+              f"(PDF_WORKERS={pdf_parser.PDF_WORKERS})")
+
+        pdf = synthetic.result_pdf(rows)
+        failures += not check_api_upload(rows, pdf)
+    finally:
+        pdf_parser.shutdown_pool()
+        os.remove(path)
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,129 @@
+"""
+Query-plan regression check: the hot results, autonomous_results and
+internal_marks queries must use the declared indexes. Every table and index
+must also compile for MySQL, which rejects VARCHAR columns without a length.
+
+Run from backend/:  python -m benchmarks.check_query_plans   (exits non-zero on regression)
+"""
+import sys
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+import autonomous_parser
+import cgpa_sql
+import internal_parser
+import migrations
+import models
+import pdf_parser
+import result_batch
+import result_queries
+import summary
+from database import upsert_lookup_query
+from models import AutonomousResult, InternalMark
+
+# Every statement comes from the code that runs it, so the plans stay in step
+HTNOS = ["24B81A0101", "24B81A0102"]
+RESULTS_KERNEL, AUTONOMOUS_KERNEL = summary.kernel_queries(HTNOS)
+
+CHECKS = {
+    "duplicate preload": (
+        pdf_parser.existing_rows_query(HTNOS, 2024, 1),
+        ("ux_results_attempt", "ix_results_htno_cgpa"),
+    ),
+    "summary refresh": (
+        RESULTS_KERNEL,
+        ("COVERING INDEX ix_results_htno_cgpa",),
+    ),
+    "cgpa range scan": (
+        cgpa_sql.report_query("24B81A0101", "24B81A0199"),
+        ("ix_results_htno_cgpa",),
+    ),
+    "result lookup": (
+        result_queries.result_query("24B81A0101"),
+        ("ux_results_attempt", "ix_results_htno_cgpa"),
+    ),
+    "batch results": (
+        result_queries.batch_results_query(HTNOS),
+        ("ux_results_attempt", "ix_results_htno_cgpa"),
+    ),
+    "batch internals": (
+        result_queries.batch_internals_query(HTNOS),
+        ("ux_internal_marks_subject",),
+    ),
+    "batch range htnos": (
+        result_queries.range_htnos_query("24B81A0101", "24B81A0199", result_batch.BATCH_MAX_HTNOS + 1),
+        ("COVERING INDEX ux_results_attempt", "COVERING INDEX ix_results_htno_cgpa"),
+    ),
+    "internals upsert lookup": (
+        upsert_lookup_query(InternalMark, internal_parser.UPSERT_KEY, internal_parser.UPSERT_VALUES, HTNOS),
+        ("ux_internal_marks_subject",),
+    ),
+    "autonomous upsert lookup": (
+        upsert_lookup_query(
+            AutonomousResult, autonomous_parser.UPSERT_KEY, autonomous_parser.UPSERT_VALUES, HTNOS,
+            autonomous_parser.exam_filter(2024, 1),
+        ),
+        ("ux_autonomous_attempt", "ix_autonomous_htno_cgpa"),
+    ),
+    "autonomous summary refresh": (
+        AUTONOMOUS_KERNEL,
+        ("COVERING INDEX ix_autonomous_htno_cgpa",),
+    ),
+    "autonomous distinct htnos": (
+        result_queries.autonomous_htnos_query(),
+        ("COVERING INDEX",),
+    ),
+    "autonomous htno lookup": (
+        result_queries.autonomous_result_query("24B81A0101"),
+        ("ux_autonomous_attempt", "ix_autonomous_htno_cgpa"),
+    ),
+}
+
+def plan(conn, stmt):
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+
+def full_table_scan(detail):
+    # DISTINCT htno legitimately walks a whole index; reading the table itself never is
+    return any(
+        step.startswith(("SCAN results", "SCAN autonomous_results", "SCAN internal_marks")) and "INDEX" not in step
+        for step in detail.split(" | ")
+    )
+
+
+def mysql_ddl_errors():
+    """Tables and indexes whose DDL fails to compile for MySQL, with the error."""
+    dialect = mysql.dialect()
+    errors = []
+    for table in models.Base.metadata.sorted_tables:
+        for ddl in (CreateTable(table), *(CreateIndex(index) for index in table.indexes)):
+            try:
+                ddl.compile(dialect=dialect)
+            except Exception as e:
+                errors.append(f"{getattr(ddl.element, 'name', table.name)}: {e}")
+    return errors
+
+
+def main():
+    engine = create_engine("sqlite://")
+    migrations.migrate(engine)
+
+    failures = 0
+    errors = mysql_ddl_errors()
+    failures += bool(errors)
+    print(f"{'✅' if not errors else '❌'} MySQL DDL: "
+          f"{'; '.join(errors) or f'{len(models.Base.metadata.tables)} tables compile'}")
+    with engine.connect() as conn:
+        for name, (stmt, expected) in CHECKS.items():
+            detail = plan(conn, stmt)
+            ok = any(index in detail for index in expected) and not full_table_scan(detail)
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}: {detail}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
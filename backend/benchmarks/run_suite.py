@@ -0,0 +1,286 @@
+"""
+End-to-end benchmark suite on synthetic data, with stored baselines.
+
+  * worker cold start: `import main` in a fresh interpreter
+  * ingestion: result PDF extraction + store, autonomous PDF parse + store,
+    internals PDF parse + store, bulk store_rows() while populating the
+    read-path table
+  * /get_result latency on cold cache entries, and /get_results/batch
+    latency for a SECTION_SIZE-student section (JSON and MessagePack)
+  * /calculate_cgpa and /filter_cgpa_backlogs latency per HTNO range size,
+    from the summary table and the live SQL report
+
+Everything runs in-process against throwaway SQLite files. Metrics ending in
+"_per_s" are better when higher, "_ms" when lower; a run fails the comparison
+when a throughput or p50 metric is worse than the baseline by more than
+--tolerance. p95s are reported but not gated; they are too noisy at these sample sizes.
+
+Run from backend/:
+  python -m benchmarks.run_suite                     # compare against baselines/default.json
+  python -m benchmarks.run_suite --save-baseline     # record this machine's numbers
+  python -m benchmarks.run_suite --students 20000 --baseline large
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench-suite-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'reads.db')}")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import autonomous_parser
+import database
+import internal_parser
+import main
+import models
+import pdf_parser
+import result_cache
+from benchmarks import bench_import_time, synthetic
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+RANGE_SIZES = (10, 100, 1000)
+SECTION_SIZE = 60
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timed_requests(client, paths):
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        response = client.get(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def timed_posts(client, path, bodies):
+    latencies = []
+    for body in bodies:
+        start = time.perf_counter()
+        response = client.post(path, json=body)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def latency_metrics(prefix, latencies):
+    return {
+        f"{prefix}.p50_ms": round(statistics.median(latencies), 3),
+        f"{prefix}.p95_ms": round(percentile(latencies, 95), 3),
+    }
+
+
+def fresh_session(name):
+    engine = database.make_engine(f"sqlite:///{os.path.join(TMP_DIR, name)}")
+    models.Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, autoflush=False)()
+
+
+def best_of(repeat, fn):
+    """Shortest wall time over repeated runs, each against a fresh database."""
+    timings = []
+    for i in range(repeat):
+        engine, db = fresh_session(f"{fn.__name__}_{i}.db")
+        try:
+            timings.append(fn(db))
+        finally:
+            db.close()
+            engine.dispose()
+    return min(timings)
+
+
+def bench_startup(args):
+    samples, _ = bench_import_time.import_main_ms(args.repeat)
+    return {"startup.import_main_ms": round(statistics.median(samples), 1)}
+
+
+def bench_ingest(args):
+    metrics = {}
+    rows = synthetic.synthetic_rows(args.pdf_students, args.subjects, seed=3)
+    pdf = synthetic.result_pdf(rows)
+
+    def ingest_results(db):
+        start = time.perf_counter()
+        extracted = list(pdf_parser.extract_rows(pdf))
+        extract_elapsed = time.perf_counter() - start
+        stats = pdf_parser.store_rows(extracted, 2024, 1, "Regular", db)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        if stats["inserted"] != len(rows):
+            raise SystemExit(f"❌ Result PDF round trip lost rows: {stats['inserted']} of {len(rows)}")
+        return elapsed, extract_elapsed
+
+    elapsed, extract_elapsed = best_of(args.repeat, ingest_results)
+    metrics["ingest.result_pdf.extract_rows_per_s"] = round(len(rows) / extract_elapsed, 1)
+    metrics["ingest.result_pdf.rows_per_s"] = round(len(rows) / elapsed, 1)
+
+    autonomous = synthetic.autonomous_rows(args.pdf_students, args.subjects)
+    pdf = synthetic.autonomous_pdf(autonomous)
+
+    def ingest_autonomous(db):
+        start = time.perf_counter()
+        counts = autonomous_parser.store_autonomous_results(
+            autonomous_parser.parse_autonomous_pdf(pdf), 2024, 1, db
+        )
+        db.commit()
+        elapsed = time.perf_counter() - start
+        if counts["inserted"] != len(autonomous):
+            raise SystemExit(f"❌ Autonomous PDF round trip lost rows: {counts['inserted']} of {len(autonomous)}")
+        return elapsed
+
+    metrics["ingest.autonomous_pdf.rows_per_s"] = round(len(autonomous) / best_of(args.repeat, ingest_autonomous), 1)
+
+    records = synthetic.internal_records(args.pdf_students, args.subjects)
+    pdf = synthetic.internals_pdf(records)
+
+    def ingest_internals(db):
+        start = time.perf_counter()
+        counts = internal_parser.store_internal_marks(internal_parser.parse_internal_pdf(pdf), db)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        if counts["inserted"] != len(records):
+            raise SystemExit(f"❌ Internals PDF round trip lost records: {counts['inserted']} of {len(records)}")
+        return elapsed
+
+    metrics["ingest.internals_pdf.records_per_s"] = round(len(records) / best_of(args.repeat, ingest_internals), 1)
+    return metrics
+
+
+def bench_reads(args):
+    metrics = {}
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    start = time.perf_counter()
+    stored = synthetic.populate(db, args.students, args.subjects, args.semesters)
+    metrics["populate.store_rows_per_s"] = round(stored / (time.perf_counter() - start), 1)
+    db.close()
+
+    htnos = [f"24B81A{s:04d}" for s in range(args.students)]
+    rnd = random.Random(1)
+
+    with TestClient(main.app) as client:
+        result_cache.clear()
+        sample = rnd.sample(htnos, min(args.requests, len(htnos)))
+        metrics.update(latency_metrics(
+            "get_result", timed_requests(client, [f"/get_result/{htno}" for htno in sample])
+        ))
+
+        sections = [
+            {"htnos": rnd.sample(htnos, min(SECTION_SIZE, len(htnos)))}
+            for _ in range(args.range_requests)
+        ]
+        for fmt in ("json", "msgpack"):
+            metrics.update(latency_metrics(
+                f"get_results_batch.{fmt}.section_{SECTION_SIZE}",
+                timed_posts(client, f"/get_results/batch?format={fmt}", sections),
+            ))
+
+        for size in RANGE_SIZES:
+            if size > len(htnos):
+                continue
+            starts = [rnd.randrange(0, len(htnos) - size + 1) for _ in range(args.range_requests)]
+            ranges = [f"start_htno={htnos[i]}&end_htno={htnos[i + size - 1]}" for i in starts]
+            for live in (False, True):
+                source = "live" if live else "summary"
+                metrics.update(latency_metrics(
+                    f"calculate_cgpa.{source}.range_{size}",
+                    timed_requests(client, [f"/calculate_cgpa?{r}&live={live}" for r in ranges]),
+                ))
+                metrics.update(latency_metrics(
+                    f"filter_cgpa_backlogs.{source}.range_{size}",
+                    timed_requests(client, [
+                        f"/filter_cgpa_backlogs?{r}&min_cgpa=6&max_backlogs=1&live={live}"
+                        for r in ranges
+                    ]),
+                ))
+    return metrics
+
+
+def regressions(metrics, baseline, tolerance):
+    found = []
+    for name, value in metrics.items():
+        reference = baseline.get(name)
+        if not reference or name.endswith("p95_ms"):
+            continue
+        if name.endswith("_per_s"):
+            change = (reference - value) / reference
+        else:
+            change = (value - reference) / reference
+        if change > tolerance:
+            found.append((name, reference, value, change))
+    return found
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000, help="students in the read-path table")
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--semesters", type=int, default=2)
+    parser.add_argument("--pdf-students", type=int, default=200, help="students in the generated PDFs")
+    parser.add_argument("--requests", type=int, default=300, help="/get_result calls")
+    parser.add_argument("--range-requests", type=int, default=30, help="calls per range size")
+    parser.add_argument("--repeat", type=int, default=3, help="ingestion runs (fastest counts) and cold starts (median)")
+    parser.add_argument("--baseline", default="default", help="name under benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown (0.3 = 30%%)")
+    parser.add_argument("--output", help="also write this run's metrics to a JSON file")
+    args = parser.parse_args()
+
+    params = {key: getattr(args, key) for key in
+              ("students", "subjects", "semesters", "pdf_students", "requests", "range_requests", "repeat")}
+    try:
+        metrics = {**bench_startup(args), **bench_ingest(args), **bench_reads(args)}
+    finally:
+        database.engine.dispose()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            stored = json.load(f)
+        if stored["params"] != params:
+            print(f"⚠️ Baseline {args.baseline} was recorded with {stored['params']}; not comparing")
+        else:
+            baseline = stored["metrics"]
+
+    for name, value in metrics.items():
+        reference = baseline.get(name)
+        delta = f"{(value - reference) / reference:+7.1%}" if reference else ""
+        print(f"{name:<48} {value:>12,.2f}   {delta}")
+
+    run = {"params": params, "metrics": metrics}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(run, f, indent=2)
+            f.write("\n")
+        print(f"✅ Saved baseline {baseline_path}")
+        return
+
+    found = regressions(metrics, baseline, args.tolerance)
+    for name, reference, value, change in found:
+        print(f"❌ {name}: {reference:,.2f} -> {value:,.2f} ({change:.0%} worse)")
+    if found:
+        sys.exit(1)
+    if baseline:
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main_()
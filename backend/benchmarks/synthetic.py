@@ -0,0 +1,138 @@
+"""
+Synthetic fixtures for the benchmarks: result rows, result PDFs in the
+6/7-column grid pdf_parser reads, autonomous grade sheets autonomous_parser
+reads, internals PDFs in the word layout internal_parser reads, and
+pre-populated results tables.
+"""
+import random
+
+import pymupdf  # type: ignore
+
+from pdf_parser import store_rows
+
+GRADES = ["S", "A", "B", "C", "D", "E", "F"]
+SUBJECT_NAMES = [
+    "Data Structures", "Engineering Physics-I", "Mathematics", "Digital Logic",
+    "Operating Systems", "Computer Networks", "Database Systems", "English",
+    "Chemistry", "Software Engineering", "Compiler Design", "Machine Learning",
+]
+
+# Result PDF grid geometry (points)
+RESULT_HEADER = ["Sno", "Htno", "Subcode", "Subname", "Internals", "Grade", "Credits"]
+RESULT_WIDTHS = [40, 80, 70, 150, 60, 45, 45]
+AUTONOMOUS_HEADER = ["S.No", "Hall Ticket No", "Subject Name", "Subject Code", "Credits", "Grade"]
+AUTONOMOUS_WIDTHS = [30, 80, 150, 70, 45, 45]
+ROWS_PER_PAGE = 30
+ROW_HEIGHT = 18
+LINES_PER_PAGE = 46
+
+
+def synthetic_rows(students: int, subjects: int, seed: int = 7):
+    """Normalized (htno, subcode, subname, internals, grade, credits) rows, as store_rows takes them."""
+    rnd = random.Random(seed)
+    rows = []
+    for s in range(students):
+        htno = f"24B81A{s:04d}"
+        for j in range(subjects):
+            rows.append((htno, f"24CS11{j:02d}", f"Subject {j}", rnd.randint(10, 30),
+                         rnd.choice(GRADES), 3.0))
+    return rows
+
+
+def _grid_pdf(header, widths, cells) -> bytes:
+    """Render cells as ruled table pages of ROWS_PER_PAGE rows, header repeated on each."""
+    xs = [30]
+    for width in widths:
+        xs.append(xs[-1] + width)
+
+    doc = pymupdf.open()
+    for start in range(0, len(cells), ROWS_PER_PAGE):
+        page = doc.new_page()
+        table = [header] + cells[start:start + ROWS_PER_PAGE]
+        top = 40
+        for i, row in enumerate(table):
+            for k, cell in enumerate(row):
+                page.insert_text((xs[k] + 3, top + i * ROW_HEIGHT + 13), cell, fontsize=8)
+        for i in range(len(table) + 1):
+            page.draw_line((xs[0], top + i * ROW_HEIGHT), (xs[-1], top + i * ROW_HEIGHT))
+        for x in xs:
+            page.draw_line((x, top), (x, top + len(table) * ROW_HEIGHT))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def result_pdf(rows, seven_columns: bool = True) -> bytes:
+    """Render rows as ruled table pages that pdfplumber's extract_table() picks up."""
+    header = RESULT_HEADER if seven_columns else RESULT_HEADER[1:]
+    widths = RESULT_WIDTHS if seven_columns else RESULT_WIDTHS[1:]
+    cells = []
+    for n, (htno, subcode, subname, internals, grade, credits) in enumerate(rows, start=1):
+        row = [htno, subcode, subname, str(internals), grade, f"{credits:g}"]
+        cells.append([str(n)] + row if seven_columns else row)
+    return _grid_pdf(header, widths, cells)
+
+
+def autonomous_rows(students: int, subjects: int, seed: int = 13):
+    """(htno, subcode, subname, grade, credits) rows, as autonomous_parser yields them."""
+    rnd = random.Random(seed)
+    return [
+        (f"24B81A{s:04d}", f"24AU11{j:02d}", SUBJECT_NAMES[j % len(SUBJECT_NAMES)],
+         rnd.choice(GRADES), rnd.choice([1.5, 3.0, 4.0]))
+        for s in range(students)
+        for j in range(subjects)
+    ]
+
+
+def autonomous_pdf(rows) -> bytes:
+    """Autonomous grade sheet: columns in a different order than result PDFs, no internals."""
+    cells = [
+        [str(n), htno, subname, subcode, f"{credits:g}", grade]
+        for n, (htno, subcode, subname, grade, credits) in enumerate(rows, start=1)
+    ]
+    return _grid_pdf(AUTONOMOUS_HEADER, AUTONOMOUS_WIDTHS, cells)
+
+
+def internal_records(students: int, subjects: int, seed: int = 11):
+    """{"htno", "subject_code", "subject_name", "marks"} records with 10-digit HTNOs."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "htno": f"24{s:08d}",
+            "subject_code": f"CS{101 + j}",
+            "subject_name": SUBJECT_NAMES[j % len(SUBJECT_NAMES)],
+            "marks": rnd.randint(0, 30),
+        }
+        for s in range(students)
+        for j in range(subjects)
+    ]
+
+
+def internals_pdf(records) -> bytes:
+    """One HTNO line per student followed by "<code> <name> <marks>" lines."""
+    lines = []
+    current = None
+    for record in records:
+        if record["htno"] != current:
+            current = record["htno"]
+            lines.append(current)
+        lines.append(f"{record['subject_code']} {record['subject_name']} {record['marks']}")
+
+    doc = pymupdf.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = doc.new_page()
+        for i, line in enumerate(lines[start:start + LINES_PER_PAGE]):
+            page.insert_text((40, 50 + i * 16), line, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def populate(db, students: int, subjects: int, semesters: int = 1, year: int = 2024, seed: int = 7):
+    """Fill results (and the summary tables) through the bulk store path; returns rows stored."""
+    stored = 0
+    for semester in range(1, semesters + 1):
+        rows = synthetic_rows(students, subjects, seed + semester)
+        stored += store_rows(rows, year, semester, "Regular", db)["total_results"]
+        db.commit()
+    return stored
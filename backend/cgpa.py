@@ -0,0 +1,84 @@
+"""
+Shared CGPA kernel.
+
+Rows are compact tuples (htno, subcode, grade, credits, semester) in insertion
+order. The best attempt per (htno, subcode) is the first attempt, replaced by a
+later pass if the first was a fail/absent. Grade codes are normalized once per
+distinct raw string ("ab", "Ab", " AB" all resolve to the same entry).
+"""
+import sys
+
+from utils import GRADE_POINTS
+
+FAILED_GRADES = ("F", "AB")
+UPPER_GRADE_POINTS = {grade.upper(): points for grade, points in GRADE_POINTS.items()}
+
+_grade_cache = {}
+
+
+def grade_info(grade):
+    """Return (normalized_code, grade_points, failed) for a raw grade string."""
+    info = _grade_cache.get(grade)
+    if info is None:
+        code = sys.intern((grade or "").strip().upper())
+        info = (code, UPPER_GRADE_POINTS.get(code, 0), code in FAILED_GRADES)
+        _grade_cache[grade] = info
+    return info
+
+
+def round_gpa(points: float, credits: float) -> float:
+    return round(points / credits, 2) if credits else 0.0
+
+
+class StudentAggregate:
+    __slots__ = ("htno", "credits", "points", "backlogs", "semesters")
+
+    def __init__(self, htno: str):
+        self.htno = htno
+        self.credits = 0.0
+        self.points = 0.0
+        self.backlogs = 0
+        # semester -> [credits, points, backlogs]
+        self.semesters = {}
+
+    @property
+    def cgpa(self) -> float:
+        return round_gpa(self.points, self.credits)
+
+    def sgpa(self, semester) -> float:
+        credits, points, _ = self.semesters[semester]
+        return round_gpa(points, credits)
+
+
+def best_attempts(rows):
+    """htno -> {subcode: (grade_points, failed, credits, semester)}"""
+    best = {}
+    for htno, subcode, grade, credits, semester in rows:
+        _, points, failed = grade_info(grade)
+        subjects = best.get(htno)
+        if subjects is None:
+            subjects = best[htno] = {}
+        prev = subjects.get(subcode)
+        if prev is None or (prev[1] and not failed):
+            subjects[subcode] = (points, failed, credits or 0.0, semester)
+    return best
+
+
+def aggregate(rows):
+    """Return {htno: StudentAggregate} in first-seen order."""
+    students = {}
+    for htno, subjects in best_attempts(rows).items():
+        student = students[htno] = StudentAggregate(htno)
+        for points, failed, credits, semester in subjects.values():
+            sem = student.semesters.get(semester)
+            if sem is None:
+                sem = student.semesters[semester] = [0.0, 0.0, 0]
+            if failed:
+                student.backlogs += 1
+                sem[2] += 1
+                continue
+            student.credits += credits
+            student.points += credits * points
+            sem[0] += credits
+            sem[1] += credits * points
+    return students
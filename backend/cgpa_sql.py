@@ -0,0 +1,100 @@
+"""
+CGPA/backlog report computed entirely in SQL from the results and
+autonomous_results tables.
+
+The best attempt per (htno, subcode) is the earliest passing row, or the first
+row when every attempt failed; ROW_NUMBER() picks it on both SQLite (3.25+)
+and MySQL 8. Results rows come before autonomous rows, as in summary.kernel_rows().
+"""
+from sqlalchemy import case, func, literal, select, union_all
+
+from cgpa import FAILED_GRADES, UPPER_GRADE_POINTS
+from database import stream_rows
+from models import AutonomousResult, Result
+
+ROUNDING_SLACK = 0.005
+STREAM_CHUNK = 500
+
+
+def _attempts(start_htno: str, end_htno: str):
+    """Every attempt in the range from both tables; the range is applied per table so both indexes are used."""
+    return union_all(
+        select(
+            Result.htno, Result.subcode, Result.grade, Result.credits,
+            literal(0).label("source"), Result.id,
+        ).where(Result.htno.between(start_htno, end_htno)),
+        select(
+            AutonomousResult.htno, AutonomousResult.subcode, AutonomousResult.grade, AutonomousResult.credits,
+            literal(1).label("source"), AutonomousResult.id,
+        ).where(
+            AutonomousResult.htno.between(start_htno, end_htno),
+            AutonomousResult.semester.is_not(None),
+        ),
+    ).subquery()
+
+
+def report_query(start_htno: str, end_htno: str, min_cgpa=None, max_cgpa=None,
+                 min_backlogs=None, max_backlogs=None):
+    attempts = _attempts(start_htno, end_htno)
+    grade = func.upper(func.trim(attempts.c.grade))
+    ranked = select(
+        attempts.c.htno,
+        func.coalesce(attempts.c.credits, 0.0).label("credits"),
+        grade.label("grade"),
+        func.row_number().over(
+            partition_by=(attempts.c.htno, attempts.c.subcode),
+            order_by=(case((grade.in_(FAILED_GRADES), 1), else_=0), attempts.c.source, attempts.c.id),
+        ).label("attempt_rank"),
+    ).subquery()
+
+    failed = ranked.c.grade.in_(FAILED_GRADES)
+    grade_points = case(UPPER_GRADE_POINTS, value=ranked.c.grade, else_=0)
+    credits = func.sum(case((failed, 0.0), else_=ranked.c.credits))
+    points = func.sum(case((failed, 0.0), else_=ranked.c.credits * grade_points))
+
+    # Rounded in Python so ties match the summary table; HAVING uses the raw ratio
+    raw_cgpa = func.coalesce(points / func.nullif(credits, 0), 0.0)
+    backlogs = func.sum(case((failed, 1), else_=0))
+
+    stmt = (
+        select(ranked.c.htno, raw_cgpa.label("cgpa"), backlogs.label("backlogs"))
+        .where(ranked.c.attempt_rank == 1)
+        .group_by(ranked.c.htno)
+        .order_by(ranked.c.htno)
+    )
+
+    # Widened by half a hundredth so nothing that rounds into range is dropped
+    if min_cgpa is not None:
+        stmt = stmt.having(raw_cgpa >= min_cgpa - ROUNDING_SLACK)
+    if max_cgpa is not None:
+        stmt = stmt.having(raw_cgpa < max_cgpa + ROUNDING_SLACK)
+    if min_backlogs is not None:
+        stmt = stmt.having(backlogs >= min_backlogs)
+    if max_backlogs is not None:
+        stmt = stmt.having(backlogs < max_backlogs)
+    return stmt
+
+
+def finalize(rows, min_cgpa=None, max_cgpa=None):
+    """Round raw (htno, cgpa, backlogs) rows and apply the exact CGPA bounds."""
+    for htno, raw_cgpa, backlogs in rows:
+        cgpa = round(raw_cgpa, 2)
+        if min_cgpa is not None and cgpa < min_cgpa:
+            continue
+        if max_cgpa is not None and cgpa >= max_cgpa:
+            continue
+        yield htno, cgpa, backlogs
+
+
+def report(db, start_htno: str, end_htno: str, min_cgpa=None, max_cgpa=None,
+           min_backlogs=None, max_backlogs=None):
+    """Yield (htno, cgpa, backlogs) for students matching the filters."""
+    stmt = report_query(start_htno, end_htno, min_cgpa, max_cgpa, min_backlogs, max_backlogs)
+    yield from finalize(stream_rows(db, stmt, STREAM_CHUNK), min_cgpa, max_cgpa)
+
+
+async def report_async(db, start_htno: str, end_htno: str, min_cgpa=None, max_cgpa=None,
+                       min_backlogs=None, max_backlogs=None):
+    """AsyncSession variant of report(); returns a list."""
+    stmt = report_query(start_htno, end_htno, min_cgpa, max_cgpa, min_backlogs, max_backlogs)
+    return list(finalize(await db.execute(stmt), min_cgpa, max_cgpa))
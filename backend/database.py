@@ -1,15 +1,186 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, insert, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./results.db"
+import metrics
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./results.db")
+# Optional replica for GET endpoints; defaults to the primary database
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# Async read path (aiosqlite / asyncmy); derived from the read URL unless set
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL")
+
+# SQLite tuning
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", "65536"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+
+# Server database (MySQL) pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Rows fetched per round trip by stream_rows()
+DB_STREAM_CHUNK = int(os.getenv("DB_STREAM_CHUNK", "2000"))
+
+
+def _install_sqlite_pragmas(engine, read_only: bool):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _):
+        # WAL lets readers keep going while an upload commits
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _server_pool_args():
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def make_engine(url: str, read_only: bool = False):
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        )
+        _install_sqlite_pragmas(engine, read_only)
+    else:
+        engine = create_engine(url, **_server_pool_args())
+    metrics.count_queries(engine)
+    return engine
+
+
+def async_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if parsed.get_backend_name() == "mysql":
+        return parsed.set(drivername="mysql+asyncmy").render_as_string(hide_password=False)
+    return url
+
+
+def make_async_engine(url: str, read_only: bool = False):
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+        _install_sqlite_pragmas(engine.sync_engine, read_only)
+    else:
+        engine = create_async_engine(url, **_server_pool_args())
+    metrics.count_queries(engine.sync_engine)
+    return engine
+
+
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(READ_DATABASE_URL, read_only=True) if READ_DATABASE_URL else engine
+
+async_read_engine = make_async_engine(
+    ASYNC_READ_DATABASE_URL or async_url(READ_DATABASE_URL or DATABASE_URL), read_only=True
+)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def stream_rows(db, stmt, chunk: int = DB_STREAM_CHUNK):
+    """
+    Run a column-projected select on the session's Core connection and stream
+    plain rows in chunks: no ORM entities, identity map or full buffering.
+    """
+    return db.connection().execute(stmt.execution_options(stream_results=True, yield_per=chunk))
+
+def insert_ignore(table):
+    """INSERT that skips rows a unique index rejects (SQLite OR IGNORE / MySQL IGNORE)."""
+    return insert(table).prefix_with("OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql")
+
+def upsert_lookup_query(model, key, values, first_keys, where=()):
+    """upsert_chunk's lookup: id, key and value columns of stored rows whose first key is listed."""
+    columns = [getattr(model, column) for column in (*key, *values)]
+    return select(model.id, *columns).where(*where, columns[0].in_(first_keys))
+
+
+def upsert_chunk(db, model, rows, key, values, on_conflict: str, counts: dict, where=()):
+    """
+    Write one chunk of row dicts matched on the key columns (the first one
+    indexed) among rows passing where: new keys are inserted, changed values
+    updated unless on_conflict is "skip". Adds to counts' inserted/updated/
+    skipped and returns the rows that were written.
+    """
+    # Within a chunk the last row wins for upsert, the first for skip
+    latest = {}
+    for row in rows:
+        row_key = tuple(row[column] for column in key)
+        if row_key in latest:
+            counts["skipped"] += 1
+            if on_conflict == "skip":
+                continue
+        latest[row_key] = row
+
+    # Earlier chunks were written on this connection, so they show up here too
+    lookup = upsert_lookup_query(model, key, values, {row_key[0] for row_key in latest}, where)
+    with metrics.span("db_lookup"):
+        existing = {
+            tuple(found[1:len(key) + 1]): (found[0], tuple(found[len(key) + 1:]))
+            for found in stream_rows(db, lookup)
+        }
+
+    inserts = []
+    updates = []
+    written = []
+    for row_key, row in latest.items():
+        current = existing.get(row_key)
+        if current is None:
+            inserts.append(row)
+        elif on_conflict == "skip" or current[1] == tuple(row[column] for column in values):
+            counts["skipped"] += 1
+            continue
+        else:
+            updates.append({"id": current[0], **{column: row[column] for column in values}})
+        written.append(row)
+
+    with metrics.span("db_write"):
+        if inserts:
+            # The unique index backs up the lookup against concurrent uploads
+            db.execute(insert_ignore(model), inserts)
+        if updates:
+            db.execute(update(model), updates)
+    counts["inserted"] += len(inserts)
+    counts["updated"] += len(updates)
+    return written
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,72 +1,127 @@
-import fitz  # type: ignore
-
+import logging
+import os
 import re
 
-def parse_internal_pdf(file_path: str):
-    doc = fitz.open(file_path)
-    data = []
-    current_htno = None
+from sqlalchemy.orm import Session
+
+import metrics
+from database import upsert_chunk
+from models import InternalMark
+
+logger = logging.getLogger(__name__)
+
+# What to do when (htno, subject_code) is already stored: "upsert" or "skip"
+ON_CONFLICT = os.getenv("INTERNALS_ON_CONFLICT", "upsert")
+WRITE_CHUNK = 500
+UPSERT_KEY = ("htno", "subject_code")
+UPSERT_VALUES = ("subject_name", "marks")
 
-    total_pages = len(doc)
-    total_words = 0
-    found_htnos = set()
-    record_attempts = 0
-    valid_records = 0
+HTNO_RE = re.compile(r"\d{10}")
+SUBJECT_CODE_RE = re.compile(r"[A-Z0-9]{4,}")
+SUBJECT_WORD_RE = re.compile(r"[A-Za-z&\-,]+")
+MARKS_RE = re.compile(r"\d{1,3}")
 
-    print(f"🔍 Parsing: {file_path}")
-    print(f"📄 Total Pages: {total_pages}")
+# Guards against swallowing a whole line when a code-like token isn't a record
+MAX_SUBJECT_WORDS = 12
 
-    for page_num, page in enumerate(doc, start=1):
-        words = page.get_text("words")  # List of [x0, y0, x1, y1, word]
-        words.sort(key=lambda w: (w[1], w[0]))  # Sort by vertical first, then horizontal
 
-        total_words += len(words)
-        print(f"📄 Page {page_num}: {len(words)} words")
+def _iter_page_records(words, current_htno, stats):
+    """
+    Single pass over one page's words: HTNO, then records of
+    <subject code> <one or more subject name words> <marks>.
+    Yields (htno, record) pairs so the caller can carry the HTNO across pages.
+    """
+    subject_code = None
+    subject_words = []
 
-        i = 0
-        while i < len(words):
-            word = words[i][4]
+    for word in words:
+        while True:
+            if subject_code is not None:
+                if MARKS_RE.fullmatch(word) and subject_words:
+                    stats["records"] += 1
+                    logger.debug("record %s | %s | %s", current_htno, subject_code, word)
+                    yield current_htno, {
+                        "htno": current_htno,
+                        "subject_code": subject_code,
+                        "subject_name": " ".join(subject_words),
+                        "marks": int(word),
+                    }
+                    subject_code = None
+                    subject_words = []
+                    break
+
+                if SUBJECT_WORD_RE.fullmatch(word) and len(subject_words) < MAX_SUBJECT_WORDS:
+                    subject_words.append(word)
+                    break
+
+                # Not part of this record; drop it and look at the word afresh
+                stats["skipped"] += 1
+                subject_code = None
+                subject_words = []
+                continue
 
             # ✅ Detect HTNO (10-digit roll number)
-            if re.fullmatch(r"\d{10}", word):
+            if HTNO_RE.fullmatch(word):
                 current_htno = word
-                found_htnos.add(current_htno)
-                print(f"🎯 Found HTNO: {current_htno}")
-                i += 1
-                continue
+                stats["htnos"].add(word)
+                yield current_htno, None
+            # ✅ Start of a subject + mark record
+            elif current_htno and SUBJECT_CODE_RE.fullmatch(word):
+                subject_code = word
+            break
 
-            # ✅ Try to detect a valid subject + mark record
-            if (
-                current_htno and
-                i + 2 < len(words) and
-                re.fullmatch(r"[A-Z0-9]{4,}", words[i][4]) and  # subject code
-                re.fullmatch(r"[A-Za-z&\-,]+", words[i + 1][4]) and  # subject name (part)
-                re.fullmatch(r"\d{1,3}", words[i + 2][4])  # marks
+
+def parse_internal_pdf(file_path, stats: dict = None):
+    """
+    Yield {"htno", "subject_code", "subject_name", "marks"} records.
+    file_path may also be the raw PDF bytes of an in-memory upload.
+    Pass a dict as stats to collect pages/words/htnos/records/skipped counters.
+    """
+    # PyMuPDF is slow to import; only uploads need it
+    import pymupdf  # type: ignore
+
+    if stats is None:
+        stats = {}
+    stats.update(pages=0, words=0, htnos=set(), records=0, skipped=0)
+    current_htno = None
+
+    if isinstance(file_path, (bytes, bytearray, memoryview)):
+        doc = pymupdf.open(stream=file_path, filetype="pdf")
+        file_path = "<upload>"
+    else:
+        doc = pymupdf.open(file_path)
+
+    with doc:
+        for page in doc:
+            with metrics.span("extract_page"):
+                words = page.get_text("words")  # List of [x0, y0, x1, y1, word, ...]
+                words.sort(key=lambda w: (w[1], w[0]))  # Sort by vertical first, then horizontal
+
+            stats["pages"] += 1
+            stats["words"] += len(words)
+
+            for current_htno, record in _iter_page_records(
+                (w[4] for w in words), current_htno, stats
             ):
-                subject_code = words[i][4]
-                subject_name = words[i + 1][4]
-                marks = int(words[i + 2][4])
-                record_attempts += 1
-
-                data.append({
-                    "htno": current_htno,
-                    "subject_code": subject_code,
-                    "subject_name": subject_name,
-                    "marks": marks
-                })
-
-                print(f"✅ Added: {current_htno} | {subject_code} | {subject_name} | {marks}")
-                valid_records += 1
-                i += 3
-                continue
+                if record:
+                    yield record
 
-            i += 1  # move to next word if no match
+    logger.info(
+        "Parsed %s: %d pages, %d words, %d HTNOs, %d records, %d partial records skipped",
+        file_path, stats["pages"], stats["words"], len(stats["htnos"]),
+        stats["records"], stats["skipped"],
+    )
 
-    print(f"\n📊 Summary:")
-    print(f"   🧾 Total Words Processed: {total_words}")
-    print(f"   👤 Unique HTNOs Found: {len(found_htnos)}")
-    print(f"   📥 Record Attempts: {record_attempts}")
-    print(f"   ✅ Valid Records Extracted: {valid_records}")
-    print(f"   ❌ Skipped Lines: {record_attempts - valid_records}")
 
-    return data
\ No newline at end of file
+def store_internal_marks(records, db: Session, on_conflict: str = ON_CONFLICT):
+    """
+    Write parsed records in WRITE_CHUNK batches keyed on (htno, subject_code);
+    the caller commits. Records are collected before the first write, so a parse_internal_pdf()
+    generator never runs inside the write transaction.
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    records = list(records)
+    for start in range(0, len(records), WRITE_CHUNK):
+        upsert_chunk(db, InternalMark, records[start:start + WRITE_CHUNK], UPSERT_KEY, UPSERT_VALUES,
+                     on_conflict, counts)
+    return counts
@@ -0,0 +1,178 @@
+"""
+Background upload jobs.
+
+Jobs run on a small thread pool in the API worker that accepted the upload,
+but their state lives in the upload_jobs table: GET /jobs/{id} answers from
+any worker, and UPLOAD_MAX_PENDING_JOBS caps queued + running uploads across
+all of them. A job whose worker died stops heartbeating and is failed after
+UPLOAD_JOB_STALE_SECONDS, so it does not hold a queue slot forever.
+"""
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.exc import OperationalError
+
+import database
+import metrics
+from models import UploadJob
+
+# Parsing is CPU heavy; a small pool plus a pending cap keeps uploads from starving readers
+JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "2"))
+MAX_PENDING_JOBS = int(os.getenv("UPLOAD_MAX_PENDING_JOBS", "8"))
+FINISHED_JOB_TTL = int(os.getenv("UPLOAD_JOB_TTL_SECONDS", "3600"))
+STALE_JOB_SECONDS = int(os.getenv("UPLOAD_JOB_STALE_SECONDS", "1800"))
+# Page progress is written through at most this often
+PROGRESS_INTERVAL = 1.0
+
+PENDING = ("queued", "running")
+STATUSES = ("queued", "running", "done", "failed")
+COUNTERS = (
+    "total_pages", "pages_processed", "rows_inserted", "rows_updated",
+    "duplicates_skipped", "supply_upgrades",
+)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# -----------------------------
+# 📦 Upload Job
+# -----------------------------
+class Job:
+    """
+    Handle the job function updates; counters are written through to
+    upload_jobs. Only the final status write can fail the job.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.error = None
+        self.total_pages = 0
+        self.pages_processed = 0
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.duplicates_skipped = 0
+        self.supply_upgrades = 0
+        self.result = None
+        self.spans = []
+        self._saved_at = 0.0
+
+    def on_pages(self, done: int, total: int):
+        self.pages_processed = done
+        self.total_pages = total
+        if done == total or time.time() - self._saved_at >= PROGRESS_INTERVAL:
+            self.heartbeat()
+
+    def heartbeat(self):
+        """Best-effort save: a lock wait is logged and retried at the next interval."""
+        try:
+            self.save()
+        except OperationalError as e:
+            print(f"⚠️ Could not record progress of upload job {self.id}: {e.orig}")
+
+    def save(self, **values):
+        """Write status, counters and timings so far; doubles as the heartbeat."""
+        self._saved_at = time.time()
+        with database.SessionLocal() as db:
+            db.execute(update(UploadJob).where(UploadJob.id == self.id).values(
+                status=self.status,
+                heartbeat_at=self._saved_at,
+                timings=json.dumps(metrics.summarize(self.spans)),
+                **{counter: getattr(self, counter) for counter in COUNTERS},
+                **values,
+            ))
+            db.commit()
+
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="upload-job")
+
+
+def _expire(db, now: float):
+    db.execute(delete(UploadJob).where(UploadJob.finished_at < now - FINISHED_JOB_TTL))
+    db.execute(update(UploadJob).where(
+        UploadJob.status.in_(PENDING),
+        UploadJob.heartbeat_at < now - STALE_JOB_SECONDS,
+    ).values(status="failed", error="Upload worker stopped responding", finished_at=now))
+
+
+def _run(job: Job, fn, args):
+    try:
+        job.status = "running"
+        job.heartbeat()
+        with metrics.trace(job.spans):
+            job.result = fn(job, *args)
+        job.status = "done"
+    except Exception as e:
+        print(f"❌ Upload job {job.id} failed: {e}")
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        try:
+            job.save(
+                error=job.error,
+                finished_at=time.time(),
+                result=json.dumps(job.result) if job.result is not None else None,
+            )
+        except Exception as e:
+            print(f"❌ Could not record upload job {job.id}: {e}")
+
+
+def submit(kind: str, fn, *args) -> Job:
+    """Queue fn(job, *args) on the upload executor; raises QueueFullError when saturated."""
+    now = time.time()
+    job = Job(kind)
+    with database.SessionLocal() as db:
+        _expire(db, now)
+        # One INSERT ... SELECT ... WHERE count < cap, so concurrent workers can't overshoot
+        pending = select(func.count()).select_from(UploadJob).where(UploadJob.status.in_(PENDING))
+        row = select(
+            literal(job.id), literal(kind), literal(job.status), literal(now), literal(now)
+        ).where(pending.scalar_subquery() < MAX_PENDING_JOBS)
+        queued = db.execute(insert(UploadJob).from_select(
+            ["id", "kind", "status", "created_at", "heartbeat_at"], row
+        )).rowcount
+        db.commit()
+    if not queued:
+        raise QueueFullError(f"{MAX_PENDING_JOBS} uploads already in progress")
+
+    _executor.submit(_run, job, fn, args)
+    return job
+
+
+def get_job(job_id: str):
+    """The job as served by GET /jobs/{id}, or None."""
+    with database.SessionLocal() as db:
+        job = db.get(UploadJob, job_id)
+        if job is None:
+            return None
+        return {
+            "job_id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "error": job.error,
+            "pages_processed": job.pages_processed,
+            "total_pages": job.total_pages,
+            "rows_inserted": job.rows_inserted,
+            "rows_updated": job.rows_updated,
+            "duplicates_skipped": job.duplicates_skipped,
+            "supply_upgrades": job.supply_upgrades,
+            "result": json.loads(job.result) if job.result else None,
+            "timings": json.loads(job.timings) if job.timings else {},
+        }
+
+
+def status_counts():
+    counts = dict.fromkeys(STATUSES, 0)
+    with database.SessionLocal() as db:
+        for status, count in db.execute(
+            select(UploadJob.status, func.count()).group_by(UploadJob.status)
+        ):
+            counts[status] = count
+    return counts
@@ -1,32 +1,63 @@
 # -------------------------------
 # 🔗 Standard & Third-Party Imports
 # -------------------------------
+import json
 import os
-import shutil
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 from fastapi import (
-    FastAPI, UploadFile, File, Form, Depends, HTTPException, Query
+    FastAPI, UploadFile, File, Form, Depends, HTTPException, Query, Header
 )
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import TypeAdapter
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # -------------------------------
 # 📦 Internal Imports
 # -------------------------------
-import models, database, schemas, pdf_parser
-from models import (
-    Result, AdminUser, AutonomousResult, InternalMark, Notification
+import database, schemas, migrations, metrics, jobs, spool
+import pdf_parser, internal_parser, autonomous_parser
+import cgpa_sql, result_batch, result_queries, result_cache, upload_cache
+import notification_feed, notification_media
+from models import AdminUser, Notification, StudentSummary, IngestedUpload
+from schemas import (
+    ConflictPolicyEnum, ExamTypeEnum, ExportFormatEnum, PdfBackendEnum, ResultFormatEnum,
+    NotificationOut, CGPAResponse
 )
-from schemas import ExamTypeEnum, NotificationOut, CGPAResponse
-from database import get_db
-from utils import GRADE_POINTS
-from internal_parser import parse_internal_pdf
+from database import get_db, get_read_db, get_async_read_db
+from internal_parser import parse_internal_pdf, store_internal_marks
 
 # -------------------------------
 # 🚀 FastAPI App Initialization
 # -------------------------------
-app = FastAPI()
+# Set MIGRATE_ON_STARTUP=0 when `python migrations.py` runs as a deploy step,
+# so restarted workers don't each re-inspect the schema before serving
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Create Tables & Indexes
+    if MIGRATE_ON_STARTUP:
+        migrations.migrate(database.engine)
+
+    # 🧹 Spool files left behind by crashed workers
+    spool.cleanup_stale()
+    yield
+
+    # 🛑 PDF extraction worker processes
+    pdf_parser.shutdown_pool()
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = metrics.ProfiledRoute
+
+# 📏 Oversized uploads are refused before Starlette spools the body (inside CORS, so errors carry its headers)
+app.add_middleware(spool.UploadSizeLimitMiddleware)
 
 # ✅ CORS for React Native
 app.add_middleware(
@@ -37,186 +68,438 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ Create Tables
-models.Base.metadata.create_all(bind=database.engine)
+# ⏱️ Per-route latency / query counts, opt-in cProfile
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # -------------------------------
-# 📄 Upload Regular/Supply Result PDF
+# ⏳ Background Upload Jobs
 # -------------------------------
-@app.post("/upload_pdf/")
-async def upload_pdf(
-    year: int = Form(...), 
-    semester: int = Form(...),
-    exam_type: ExamTypeEnum = Form(...),
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    temp_path = f"temp_{file.filename}"
-    with open(temp_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+def _spool_upload(file: UploadFile) -> spool.SpooledUpload:
+    """Receive the whole upload now; Starlette closes it once the response goes out."""
+    try:
+        with metrics.span("spool"):
+            return spool.receive(file.file)
+    except spool.UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
+def _submit_job(kind: str, fn, upload: spool.SpooledUpload, *args):
+    try:
+        job = jobs.submit(kind, fn, upload, *args)
+    except jobs.QueueFullError as e:
+        upload.close()
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"message": "⏳ Upload queued", "job_id": job.id, "status": job.status}
+
+def _already_ingested(db: Session, upload: spool.SpooledUpload, year: int, semester: int,
+                      exam_type: str, response: Response):
+    """The "Already uploaded" answer when these bytes were ingested for this exam, else None."""
+    previous = db.query(IngestedUpload).filter(
+        IngestedUpload.content_hash == upload.content_hash,
+        IngestedUpload.year == year,
+        IngestedUpload.semester == semester,
+        IngestedUpload.exam_type == exam_type
+    ).first()
+    if not previous:
+        return None
+    upload.close()
+    response.status_code = 200
+    return {
+        "message": "✅ Already uploaded",
+        "status": "done",
+        "total_results": previous.total_results,
+        "unique_students": previous.unique_students
+    }
+
+def _record_ingest(db: Session, upload: spool.SpooledUpload, year: int, semester: int,
+                   exam_type: str, total_results: int, unique_students: int):
+    """Remember the upload's content hash for the exam; the caller commits it with the rows."""
+    db.execute(database.insert_ignore(IngestedUpload), {
+        "content_hash": upload.content_hash,
+        "year": year,
+        "semester": semester,
+        "exam_type": exam_type,
+        "total_results": total_results,
+        "unique_students": unique_students,
+    })
+
+def _run_result_upload(job: jobs.Job, upload: spool.SpooledUpload, year: int, semester: int,
+                       exam_type: str, backend: str):
+    db = database.SessionLocal()
     try:
-        stats = pdf_parser.parse_pdf_and_store(temp_path, year, semester, exam_type.value, db)
+        with metrics.span("parsed_cache_lookup"):
+            cached = upload_cache.load_rows(upload.content_hash)
+        if cached:
+            total_pages, rows = cached
+            job.on_pages(total_pages, total_pages)
+        else:
+            rows = list(pdf_parser.extract_rows(upload.source, on_pages=job.on_pages, backend=backend))
+            # The cache only saves a re-parse; the upload goes ahead without it
+            try:
+                with metrics.span("parsed_cache_save"):
+                    upload_cache.save_rows(upload.content_hash, job.total_pages, rows)
+            except Exception as e:
+                print(f"⚠️ Could not cache parsed rows for upload {upload.content_hash}: {e}")
+
+        stats = pdf_parser.store_rows(rows, year, semester, exam_type, db)
+        _record_ingest(db, upload, year, semester, exam_type, stats["total_results"], stats["unique_students"])
+        with metrics.span("commit"):
+            db.commit()
+
+        job.rows_inserted = stats["inserted"]
+        job.duplicates_skipped = stats["duplicates"]
+        job.supply_upgrades = stats["upgraded"]
         return {
             "message": "✅ Regular/Supply Results Uploaded",
             "total_results": stats["total_results"],
             "unique_students": stats["unique_students"]
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
     finally:
-        os.remove(temp_path)
+        db.close()
+        upload.close()
 
-# -------------------------------
-# 📄 Upload Autonomous PDF (To Be Implemented)
-# -------------------------------
-
-# -------------------------------
-# 📄 Upload Internals PDF
-# -------------------------------
-@app.post("/upload_internals/")
-def upload_internals_pdf(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    temp_path = f"temp_{file.filename}"
-    with open(temp_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+def _run_autonomous_upload(job: jobs.Job, upload: spool.SpooledUpload, year: int, semester: int,
+                           on_conflict: str, backend: str):
+    db = database.SessionLocal()
+    try:
+        counts = autonomous_parser.store_autonomous_results(
+            autonomous_parser.parse_autonomous_pdf(upload.source, backend, on_pages=job.on_pages),
+            year, semester, db, on_conflict
+        )
+        _record_ingest(db, upload, year, semester, ExamTypeEnum.autonomous.value,
+                       counts["inserted"] + counts["updated"], counts["unique_students"])
+        with metrics.span("commit"):
+            db.commit()
+
+        job.rows_inserted = counts["inserted"]
+        job.rows_updated = counts["updated"]
+        job.duplicates_skipped = counts["skipped"]
+        return {
+            "message": "✅ Autonomous Results Uploaded",
+            "total_results": counts["inserted"] + counts["updated"],
+            **counts
+        }
+    finally:
+        db.close()
+        upload.close()
 
+def _run_internals_upload(job: jobs.Job, upload: spool.SpooledUpload, on_conflict: str):
+    db = database.SessionLocal()
     try:
-        entries = parse_internal_pdf(temp_path)
-        for entry in entries:
-            mark = InternalMark(
-                htno=entry["htno"],
-                subject_code=entry["subject_code"],
-                subject_name=entry["subject_name"],
-                marks=entry["marks"]
-            )
-            db.add(mark)
-        db.commit()
-        return {"message": "Internals uploaded", "total": len(entries)}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        counts = store_internal_marks(parse_internal_pdf(upload.source), db, on_conflict)
+        with metrics.span("commit"):
+            db.commit()
+        job.rows_inserted = counts["inserted"]
+        job.rows_updated = counts["updated"]
+        job.duplicates_skipped = counts["skipped"]
+        return {
+            "message": "Internals uploaded",
+            "total": counts["inserted"] + counts["updated"],
+            **counts
+        }
     finally:
-        os.remove(temp_path)
+        db.close()
+        upload.close()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # -------------------------------
-# 🔍 Fetch Results by HTNO
+# 📄 Upload Regular/Supply Result PDF
 # -------------------------------
-@app.get("/get_result/{htno}", response_model=list[schemas.ResultOut])
-def get_result(htno: str, db: Session = Depends(get_db)):
-    results = db.query(Result).filter(Result.htno == htno).all()
-    if not results:
-        raise HTTPException(status_code=404, detail="Result not found")
-    return results
+@app.post("/upload_pdf/", status_code=202)
+def upload_pdf(
+    response: Response,
+    year: int = Form(...), 
+    semester: int = Form(...),
+    exam_type: ExamTypeEnum = Form(...),
+    file: UploadFile = File(...),
+    backend: PdfBackendEnum = Form(PdfBackendEnum(pdf_parser.PDF_BACKEND)),
+    db: Session = Depends(get_db)
+):
+    # Autonomous grade sheets have their own layout and table; results rows would count as attempts
+    if exam_type == ExamTypeEnum.autonomous:
+        raise HTTPException(status_code=400, detail="Upload autonomous results to /upload_autonomous/")
+
+    upload = _spool_upload(file)
+
+    # Same bytes already ingested for this exam: answer with the original stats
+    previous = _already_ingested(db, upload, year, semester, exam_type.value, response)
+    if previous:
+        return previous
+
+    return _submit_job(
+        "results", _run_result_upload, upload, year, semester, exam_type.value,
+        pdf_parser.get_backend(backend.value).name
+    )
 
 # -------------------------------
-# 🧠 CGPA Calculation (Bulk)
+# 📄 Upload Autonomous PDF
 # -------------------------------
-@app.get("/calculate_cgpa", response_model=CGPAResponse)
-def calculate_cgpa(
-    start_htno: str = Query(...),
-    end_htno: str = Query(...),
+@app.post("/upload_autonomous/", status_code=202)
+def upload_autonomous_pdf(
+    response: Response,
+    year: int = Form(...),
+    semester: int = Form(...),
+    file: UploadFile = File(...),
+    on_conflict: ConflictPolicyEnum = Form(ConflictPolicyEnum(autonomous_parser.ON_CONFLICT)),
+    backend: PdfBackendEnum = Form(PdfBackendEnum(pdf_parser.PDF_BACKEND)),
     db: Session = Depends(get_db)
 ):
-    results = db.query(Result).filter(Result.htno.between(start_htno, end_htno)).all()
-    student_data = {}
+    upload = _spool_upload(file)
 
-    for res in results:
-        if res.htno not in student_data:
-            student_data[res.htno] = {}
+    previous = _already_ingested(db, upload, year, semester, ExamTypeEnum.autonomous.value, response)
+    if previous:
+        return previous
 
-        subcode = res.subcode
+    return _submit_job(
+        "autonomous", _run_autonomous_upload, upload, year, semester, on_conflict.value,
+        pdf_parser.get_backend(backend.value).name
+    )
 
-        if subcode not in student_data[res.htno]:
-            student_data[res.htno][subcode] = res
-        else:
-            prev = student_data[res.htno][subcode]
-            if prev.grade in ("F", "Ab") and res.grade not in ("F", "Ab"):
-                student_data[res.htno][subcode] = res
+# -------------------------------
+# 📄 Upload Internals PDF
+# -------------------------------
+@app.post("/upload_internals/", status_code=202)
+def upload_internals_pdf(
+    file: UploadFile = File(...),
+    on_conflict: ConflictPolicyEnum = Form(ConflictPolicyEnum(internal_parser.ON_CONFLICT))
+):
+    return _submit_job("internals", _run_internals_upload, _spool_upload(file), on_conflict.value)
+
+# -------------------------------
+# 🔍 Fetch Results by HTNO
+# -------------------------------
+_results_adapter = TypeAdapter(list[schemas.ResultOut])
 
-    report = []
+@app.get("/get_result/{htno}", response_model=list[schemas.ResultOut])
+async def get_result(htno: str, db: AsyncSession = Depends(get_async_read_db)):
+    body, generation = result_cache.get(htno)
+    if body is None:
+        results = (await db.execute(result_queries.result_query(htno))).all()
+        if not results:
+            raise HTTPException(status_code=404, detail="Result not found")
+        body = _results_adapter.dump_json(_results_adapter.validate_python(results, from_attributes=True))
+        result_cache.put(htno, body, generation)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/get_result_cache/stats")
+def get_result_cache_stats():
+    return result_cache.stats()
 
-    for htno, subjects in student_data.items():
-        total_credits = 0.0
-        total_grade_points = 0.0
-        backlogs = 0
+# -------------------------------
+# 📦 Batch Results for a Section
+# -------------------------------
 
-        for result in subjects.values():
-            grade = result.grade.upper()
-            if grade in ("F", "AB"):
-                backlogs += 1
-                continue
+@app.post("/get_results/batch", response_model=schemas.BatchResultResponse)
+async def get_results_batch(
+    request: schemas.BatchResultRequest,
+    format: ResultFormatEnum = Query(ResultFormatEnum.json),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    if request.htnos is None:
+        valid = bool(request.start_htno and request.end_htno)
+    else:
+        valid = request.start_htno is None and request.end_htno is None
+    if not valid:
+        raise HTTPException(status_code=400, detail="Pass either htnos or both start_htno and end_htno")
 
-            credits = result.credits
-            grade_point = GRADE_POINTS.get(grade, 0)
-            total_credits += credits
-            total_grade_points += credits * grade_point
+    try:
+        if request.htnos is not None:
+            htnos = result_batch.unique_htnos(request.htnos)
+        else:
+            # Walks the htno index and stops one past the cap
+            htnos = result_batch.unique_htnos((await db.scalars(result_queries.range_htnos_query(
+                request.start_htno, request.end_htno, result_batch.BATCH_MAX_HTNOS + 1
+            ))).all())
+    except result_batch.BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    result_rows = internal_rows = ()
+    if htnos:
+        result_rows = (await db.execute(result_queries.batch_results_query(htnos))).all()
+        if request.include_internals:
+            internal_rows = (await db.execute(result_queries.batch_internals_query(htnos))).all()
+
+    payload = result_batch.group(
+        htnos, result_queries.RESULT_FIELDS, result_rows,
+        result_queries.INTERNAL_FIELDS if request.include_internals else None, internal_rows
+    )
+    return Response(
+        content=result_batch.encode(payload, format.value),
+        media_type=result_batch.MEDIA_TYPES[format.value],
+    )
 
-        cgpa = round(total_grade_points / total_credits, 2) if total_credits else 0.0
+# -------------------------------
+# 📈 Prometheus Metrics
+# -------------------------------
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    cache = result_cache.stats()
+    extra = [
+        ("result_cache_hits_total", "counter", "Result cache hits", [({}, cache["hits"])]),
+        ("result_cache_misses_total", "counter", "Result cache misses", [({}, cache["misses"])]),
+        ("result_cache_evictions_total", "counter", "Result cache capacity evictions", [({}, cache["evictions"])]),
+        ("result_cache_entries", "gauge", "Cached /get_result responses", [({}, cache["size"])]),
+        ("upload_jobs", "gauge", "Tracked upload jobs by status",
+         [({"status": status}, count) for status, count in jobs.status_counts().items()]),
+    ]
+    return Response(content=metrics.render(extra), media_type="text/plain; version=0.0.4")
 
-        report.append({
-            "htno": htno,
-            "cgpa": cgpa,
-            "backlogs": backlogs
-        })
+# -------------------------------
+# 🧠 CGPA Rows (summary table or live SQL)
+# -------------------------------
+EXPORT_CHUNK = 500
 
-    return {"report": report}
+def _summary_query(start_htno: str, end_htno: str,
+                   min_cgpa=None, max_cgpa=None, min_backlogs=None, max_backlogs=None):
+    stmt = select(StudentSummary.htno, StudentSummary.cgpa, StudentSummary.backlogs).where(
+        StudentSummary.htno.between(start_htno, end_htno)
+    )
+    if min_cgpa is not None:
+        stmt = stmt.where(StudentSummary.cgpa >= min_cgpa)
+    if max_cgpa is not None:
+        stmt = stmt.where(StudentSummary.cgpa < max_cgpa)
+    if min_backlogs is not None:
+        stmt = stmt.where(StudentSummary.backlogs >= min_backlogs)
+    if max_backlogs is not None:
+        stmt = stmt.where(StudentSummary.backlogs < max_backlogs)
+    return stmt.order_by(StudentSummary.htno)
+
+def _cgpa_rows(db: Session, start_htno: str, end_htno: str, live: bool, *filters):
+    """Yield (htno, cgpa, backlogs) without loading the whole range into memory."""
+    if live:
+        return cgpa_sql.report(db, start_htno, end_htno, *filters)
+    stmt = _summary_query(start_htno, end_htno, *filters)
+    return database.stream_rows(db, stmt, EXPORT_CHUNK)
+
+async def _cgpa_rows_async(db: AsyncSession, start_htno: str, end_htno: str, live: bool, *filters):
+    if live:
+        return await cgpa_sql.report_async(db, start_htno, end_htno, *filters)
+    return (await db.execute(_summary_query(start_htno, end_htno, *filters))).all()
+
+def _stream_cgpa(export_format: ExportFormatEnum, filename: str, *args):
+    """Stream rows as NDJSON or CSV from a session owned by the response body."""
+    def body():
+        db = database.ReadSessionLocal()
+        try:
+            lines = ["htno,cgpa,backlogs\n"] if export_format == ExportFormatEnum.csv else []
+            for htno, cgpa, backlogs in _cgpa_rows(db, *args):
+                if export_format == ExportFormatEnum.csv:
+                    lines.append(f"{htno},{cgpa},{backlogs}\n")
+                else:
+                    lines.append(json.dumps({"htno": htno, "cgpa": cgpa, "backlogs": backlogs}) + "\n")
+                if len(lines) >= EXPORT_CHUNK:
+                    yield "".join(lines)
+                    lines = []
+            if lines:
+                yield "".join(lines)
+        finally:
+            db.close()
+
+    media_type = "text/csv" if export_format == ExportFormatEnum.csv else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
+
+# -------------------------------
+# 🧠 CGPA Calculation (Bulk)
+# -------------------------------
+@app.get("/calculate_cgpa", response_model=CGPAResponse)
+async def calculate_cgpa(
+    start_htno: str = Query(...),
+    end_htno: str = Query(...),
+    live: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    rows = await _cgpa_rows_async(db, start_htno, end_htno, live)
+    return {"report": [
+        {"htno": htno, "cgpa": cgpa, "backlogs": backlogs}
+        for htno, cgpa, backlogs in rows
+    ]}
+
+@app.get("/calculate_cgpa/export")
+def export_cgpa(
+    start_htno: str = Query(...),
+    end_htno: str = Query(...),
+    live: bool = Query(False),
+    format: ExportFormatEnum = Query(ExportFormatEnum.ndjson)
+):
+    return _stream_cgpa(format, "cgpa_report", start_htno, end_htno, live)
 
 # -------------------------------
 # 🔍 Filter by CGPA/Backlogs
 # -------------------------------
 @app.get("/filter_cgpa_backlogs", response_model=CGPAResponse)
-def filter_cgpa_backlogs(
+async def filter_cgpa_backlogs(
     min_cgpa: float = Query(0.0),
     max_cgpa: float = Query(10.0),
     min_backlogs: int = Query(0),
     max_backlogs: int = Query(100),
     start_htno: str = Query(...),
     end_htno: str = Query(...),
-    db: Session = Depends(get_db)
+    live: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    results = db.query(Result).filter(Result.htno.between(start_htno, end_htno)).all()
-    student_data = {}
-
-    for res in results:
-        if res.htno not in student_data:
-            student_data[res.htno] = {}
-
-        subcode = res.subcode
-        grade = res.grade.upper()
-
-        if subcode not in student_data[res.htno]:
-            student_data[res.htno][subcode] = res
-        else:
-            prev = student_data[res.htno][subcode]
-            if prev.grade.upper() in ("F", "AB") and grade not in ("F", "AB"):
-                student_data[res.htno][subcode] = res
-
-    report = []
-
-    for htno, subjects in student_data.items():
-        total_credits = 0.0
-        total_points = 0.0
-        backlogs = 0
-
-        for res in subjects.values():
-            grade = res.grade.upper()
-            if grade in ("F", "AB"):
-                backlogs += 1
-                continue
-
-            gp = GRADE_POINTS.get(grade, 0)
-            total_credits += res.credits
-            total_points += res.credits * gp
+    rows = await _cgpa_rows_async(
+        db, start_htno, end_htno, live, min_cgpa, max_cgpa, min_backlogs, max_backlogs
+    )
+    return {"report": [
+        {"htno": htno, "cgpa": cgpa, "backlogs": backlogs}
+        for htno, cgpa, backlogs in rows
+    ]}
 
-        cgpa = round(total_points / total_credits, 2) if total_credits else 0.0
+@app.get("/filter_cgpa_backlogs/export")
+def export_filtered_cgpa(
+    min_cgpa: float = Query(0.0),
+    max_cgpa: float = Query(10.0),
+    min_backlogs: int = Query(0),
+    max_backlogs: int = Query(100),
+    start_htno: str = Query(...),
+    end_htno: str = Query(...),
+    live: bool = Query(False),
+    format: ExportFormatEnum = Query(ExportFormatEnum.ndjson)
+):
+    return _stream_cgpa(
+        format, "cgpa_filtered", start_htno, end_htno, live,
+        min_cgpa, max_cgpa, min_backlogs, max_backlogs
+    )
 
-        if (min_cgpa <= cgpa < max_cgpa) and (min_backlogs <= backlogs < max_backlogs):
-            report.append({
-                "htno": htno,
-                "cgpa": cgpa,
-                "backlogs": backlogs
-            })
+# -------------------------------
+# 📊 Cohort Analytics
+# -------------------------------
+# pandas is imported on first use so workers that only serve lookups start fast
+@app.get("/analytics/cohort", response_model=schemas.CohortReport)
+def cohort_analytics(
+    year: Optional[int] = Query(None),
+    semester: Optional[int] = Query(None),
+    start_htno: Optional[str] = Query(None),
+    end_htno: Optional[str] = Query(None),
+    top: int = Query(10, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
+    import analytics
+
+    frame = analytics.load_frame(db, year, semester, start_htno, end_htno)
+    return analytics.cohort_report(frame, top)
+
+@app.get("/analytics/sgpa", response_model=schemas.SGPAResponse)
+def sgpa_analytics(
+    year: Optional[int] = Query(None),
+    semester: Optional[int] = Query(None),
+    start_htno: Optional[str] = Query(None),
+    end_htno: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    import analytics
 
-    return {"report": report}
+    frame = analytics.load_frame(db, year, semester, start_htno, end_htno)
+    return {"report": analytics.sgpa_report(frame)}
 
 # -------------------------------
 # 🔐 Admin Signup & Login
@@ -242,13 +525,25 @@ def login(data: schemas.AdminCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {"message": "Login successful", "user": {"id": user.id, "username": user.username}}
 
+# -------------------------------
+# 🏫 Autonomous Results by HTNO
+# -------------------------------
+_autonomous_adapter = TypeAdapter(list[schemas.AutonomousResultOut])
+
+@app.get("/get_autonomous_result/{htno}", response_model=list[schemas.AutonomousResultOut])
+async def get_autonomous_result(htno: str, db: AsyncSession = Depends(get_async_read_db)):
+    results = (await db.execute(result_queries.autonomous_result_query(htno))).all()
+    if not results:
+        raise HTTPException(status_code=404, detail="Result not found")
+    body = _autonomous_adapter.dump_json(_autonomous_adapter.validate_python(results, from_attributes=True))
+    return Response(content=body, media_type="application/json")
+
 # -------------------------------
 # 🐞 Debug HTNOs
 # -------------------------------
 @app.get("/debug_autonomous_htnos")
-def debug_autonomous_htnos(db: Session = Depends(get_db)):
-    results = db.query(AutonomousResult).all()
-    return list({r.htno for r in results})
+async def debug_autonomous_htnos(db: AsyncSession = Depends(get_async_read_db)):
+    return (await db.scalars(result_queries.autonomous_htnos_query())).all()
 
 # -------------------------------
 # 📢 Notifications (CRUD)
@@ -256,8 +551,19 @@ def debug_autonomous_htnos(db: Session = Depends(get_db)):
 UPLOAD_DIR = "uploads/notifications"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+class CachedStaticFiles(StaticFiles):
+    """Attachment names are unique per upload, so they can be cached forever."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 206, 304):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/uploads/notifications", CachedStaticFiles(directory=UPLOAD_DIR), name="notification_files")
+
 @app.post("/notifications/", response_model=NotificationOut)
-async def create_notification(
+def create_notification(
     heading: str = Form(...),
     description: str = Form(...),
     file: UploadFile = File(None),
@@ -265,10 +571,12 @@ async def create_notification(
 ):
     file_path = None
     if file:
-        filename = f"{datetime.utcnow().timestamp()}_{file.filename}"
+        filename = f"{datetime.utcnow().timestamp()}_{uuid.uuid4().hex[:8]}_{os.path.basename(file.filename)}"
         file_location = os.path.join(UPLOAD_DIR, filename)
-        with open(file_location, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        try:
+            spool.save_to(file.file, file_location)
+        except spool.UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
         file_path = f"/uploads/notifications/{filename}"
 
     notif = Notification(
@@ -279,11 +587,53 @@ async def create_notification(
     db.add(notif)
     db.commit()
     db.refresh(notif)
+    notification_feed.invalidate()
+    if file_path:
+        notification_media.submit(notif.id, file_path)
     return notif
 
+_notifications_adapter = TypeAdapter(list[NotificationOut])
+
 @app.get("/notifications/", response_model=list[NotificationOut])
-def get_notifications(db: Session = Depends(get_db)):
-    return db.query(Notification).order_by(Notification.created_at.desc()).all()
+async def get_notifications(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    key = (cursor, limit)
+    page, generation = notification_feed.get(key)
+    if page is None:
+        stmt = select(Notification).order_by(Notification.created_at.desc(), Notification.id.desc())
+        if cursor:
+            try:
+                created_at, notification_id = notification_feed.decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            stmt = stmt.where(
+                tuple_(Notification.created_at, Notification.id) < tuple_(created_at, notification_id)
+            )
+
+        # One extra row tells us whether another page follows
+        rows = (await db.execute(stmt.limit(limit + 1))).scalars().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = notification_feed.encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        body = _notifications_adapter.dump_json(
+            _notifications_adapter.validate_python(rows, from_attributes=True)
+        )
+        page = (body, notification_feed.etag_for(body), next_cursor)
+        notification_feed.put(key, page, generation)
+
+    body, etag, next_cursor = page
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if notification_feed.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.delete("/notifications/{notification_id}", response_model=dict)
 def delete_notification(notification_id: int, db: Session = Depends(get_db)):
@@ -291,12 +641,11 @@ def delete_notification(notification_id: int, db: Session = Depends(get_db)):
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    # Remove attached file
+    # Remove attached file and its thumbnail/compressed variants
     if notification.file_path:
-        file_disk_path = notification.file_path.lstrip("/")
-        if os.path.exists(file_disk_path):
-            os.remove(file_disk_path)
+        notification_media.remove_files(notification.file_path)
 
     db.delete(notification)
     db.commit()
+    notification_feed.invalidate()
     return {"message": "Notification deleted successfully"}
@@ -0,0 +1,308 @@
+"""
+In-process instrumentation rendered in the Prometheus text format on /metrics.
+
+* span(stage): times a hot-path stage (spooling, page extraction, row
+  normalization, DB lookups, writes, commit) into stage_duration_seconds.
+  Inside trace(), spans are also collected for the caller (upload jobs report
+  them; pool workers only collect them and ship them back to the parent
+  process, which records them).
+* RequestMetricsMiddleware: per-route latency and DB query count histograms.
+  Queries are counted by an engine listener installed with count_queries().
+* Profiling: when PROFILE_TOKEN is set, a request carrying the same value in
+  X-Profile is run under cProfile and dumped to PROFILE_DIR. Sync endpoints
+  are profiled in their worker thread via ProfiledRoute; the event loop thread
+  is profiled around the whole request.
+
+Counters are per process; with several workers, scrape each one.
+"""
+import cProfile
+import functools
+import hmac
+import inspect
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "result-analysis-profiles"))
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in snapshot)
+        return lines
+
+
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent per ingestion/query stage", SECONDS_BUCKETS)
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route", SECONDS_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "DB statements executed per request", QUERY_BUCKETS)
+DB_QUERIES = Counter("db_queries_total", "DB statements executed")
+_REGISTRY = (STAGE_SECONDS, REQUEST_SECONDS, REQUEST_QUERIES, DB_QUERIES)
+
+_trace = ContextVar("metrics_trace", default=None)
+_publish = ContextVar("metrics_publish", default=True)
+_request_queries = ContextVar("metrics_request_queries", default=None)
+_thread_profiles = ContextVar("metrics_thread_profiles", default=None)
+
+
+# -----------------------------
+# ⏱️ Stage spans
+# -----------------------------
+def observe(stage: str, seconds: float):
+    spans = _trace.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+    if _publish.get():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def trace(spans: list = None, publish: bool = True):
+    """
+    Also collect (stage, seconds) for every span in this context into spans.
+    publish=False only collects them: pool workers hand their spans back for
+    the parent to record() instead of updating a histogram nobody scrapes.
+    """
+    spans = [] if spans is None else spans
+    token = _trace.set(spans)
+    publish_token = _publish.set(publish)
+    try:
+        yield spans
+    finally:
+        _publish.reset(publish_token)
+        _trace.reset(token)
+
+
+def record(spans):
+    """Replay spans collected elsewhere, e.g. returned by a process pool worker."""
+    for stage, seconds in spans:
+        observe(stage, seconds)
+
+
+def summarize(spans):
+    """{stage: {"count": n, "seconds": total}} in first-seen order."""
+    totals = {}
+    for stage, seconds in list(spans):
+        entry = totals.setdefault(stage, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+    for entry in totals.values():
+        entry["seconds"] = round(entry["seconds"], 4)
+    return totals
+
+
+# -----------------------------
+# 🗄️ DB query counting
+# -----------------------------
+def count_queries(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        DB_QUERIES.inc()
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+# -----------------------------
+# 🔬 Opt-in cProfile
+# -----------------------------
+def _profile_requested(scope) -> bool:
+    if not PROFILE_TOKEN:
+        return False
+    for name, value in scope.get("headers", ()):
+        if name == b"x-profile":
+            return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+    return False
+
+
+def _profile_path(scope) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    return os.path.join(PROFILE_DIR, f"{time.time():.6f}_{scope['method']}_{slug}.prof")
+
+
+def _dump_profile(path: str, profiler, thread_profiles):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stats = pstats.Stats(profiler)
+    if thread_profiles:
+        stats.add(*thread_profiles)
+    stats.dump_stats(path)
+
+
+def _profile_in_thread(endpoint):
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiles = _thread_profiles.get()
+        if profiles is None:
+            return endpoint(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(endpoint, *args, **kwargs)
+        finally:
+            profiles.append(profiler)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that lets a profiled request follow sync endpoints into the threadpool."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _profile_in_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+# -----------------------------
+# 🌐 Request middleware
+# -----------------------------
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = [0]
+        queries_token = _request_queries.set(queries)
+        status = [500]
+        profiler = profile_path = profiles_token = None
+        if _profile_requested(scope):
+            profile_path = _profile_path(scope)
+            profiles_token = _thread_profiles.set([])
+            profiler = cProfile.Profile()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if profile_path:
+                    message["headers"] = list(message.get("headers", ())) + [
+                        (b"x-profile-file", os.path.basename(profile_path).encode())
+                    ]
+            await send(message)
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Mounted static files have no route; label them by mount point
+            path = route.path if route is not None else scope.get("root_path") or "unmatched"
+            REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=path, status=status[0])
+            REQUEST_QUERIES.observe(queries[0], method=scope["method"], route=path)
+            _request_queries.reset(queries_token)
+            if profiler:
+                _dump_profile(profile_path, profiler, _thread_profiles.get())
+                _thread_profiles.reset(profiles_token)
+
+
+# -----------------------------
+# 📤 Exposition
+# -----------------------------
+def render(extra=()) -> str:
+    """
+    Prometheus text exposition of every registered metric plus extra families,
+    given as (name, type, help, [(labels_dict, value), ...]).
+    """
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    for name, kind, help_text, samples in extra:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(
+            f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}"
+            for labels, value in samples
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+"""
+Idempotent schema upgrades for existing databases.
+
+create_all() only creates missing tables, so indexes added to existing tables
+are created here. Run:  python migrations.py
+
+The API runs this on startup unless MIGRATE_ON_STARTUP=0; multi-worker
+deployments should run it once as a deploy step and turn that off.
+"""
+from sqlalchemy import MetaData, Table, delete, func, inspect, select, text
+from sqlalchemy.orm import Session
+
+import models
+import summary
+from models import AutonomousResult, InternalMark, Notification, Result, StudentSummary
+
+# Single-column htno indexes made redundant by the composite indexes leading with htno
+OBSOLETE_INDEXES = {
+    "results": "ix_results_htno",
+    "autonomous_results": "ix_autonomous_results_htno",
+    "internal_marks": "ix_internal_marks_htno",
+}
+
+
+def _add_missing_columns(engine, table):
+    """ALTER TABLE ADD COLUMN for nullable columns added to a model after release."""
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"➕ Added {table.name}.{column.name}")
+
+
+def _dedupe_results(db: Session):
+    """Drop repeated attempts so the unique index can be built; keeps the oldest row."""
+    key = (Result.htno, Result.subcode, Result.semester, Result.year, Result.exam_type)
+    keep = select(func.min(Result.id)).group_by(*key)
+    htnos = [htno for (htno,) in db.execute(
+        select(Result.htno).where(Result.id.not_in(keep)).distinct()
+    )]
+    if not htnos:
+        return 0
+
+    removed = db.execute(delete(Result).where(Result.id.not_in(keep))).rowcount
+    summary.refresh_students(db, htnos)
+    db.commit()
+    print(f"🧹 Removed {removed} duplicate results before adding unique index")
+    return removed
+
+
+def _dedupe_internal_marks(db: Session):
+    """Keep the most recent upload per (htno, subject_code) before the unique index."""
+    keep = select(func.max(InternalMark.id)).group_by(InternalMark.htno, InternalMark.subject_code)
+    removed = db.execute(delete(InternalMark).where(InternalMark.id.not_in(keep))).rowcount
+    db.commit()
+    if removed:
+        print(f"🧹 Removed {removed} duplicate internal marks before adding unique index")
+    return removed
+
+
+def _dedupe_autonomous_results(db: Session):
+    """Keep the most recent row per exam before the unique index; legacy rows have no exam."""
+    key = (AutonomousResult.htno, AutonomousResult.subcode, AutonomousResult.semester, AutonomousResult.year)
+    keep = select(func.max(AutonomousResult.id)).group_by(*key)
+    removed = db.execute(delete(AutonomousResult).where(
+        AutonomousResult.semester.is_not(None),
+        AutonomousResult.year.is_not(None),
+        AutonomousResult.id.not_in(keep),
+    )).rowcount
+    db.commit()
+    if removed:
+        print(f"🧹 Removed {removed} duplicate autonomous results before adding unique index")
+    return removed
+
+
+def _drop_obsolete_indexes(engine, indexes):
+    """Drop OBSOLETE_INDEXES still present; each one only adds write cost to uploads."""
+    for table_name, index_name in OBSOLETE_INDEXES.items():
+        if index_name not in indexes.get(table_name, ()):
+            continue
+        table = Table(table_name, MetaData(), autoload_with=engine)
+        for index in table.indexes:
+            if index.name == index_name:
+                index.drop(bind=engine)
+                print(f"➖ Dropped redundant index {index_name}")
+
+
+def _normalize_notification_timestamps(db: Session):
+    """
+    SQLite's CURRENT_TIMESTAMP default has no fractional seconds while SQLAlchemy
+    binds datetimes with them; pad old rows so cursor comparisons are exact.
+    """
+    if db.bind.dialect.name != "sqlite":
+        return
+    db.execute(text(
+        "UPDATE college_notifications SET created_at = created_at || '.000000' "
+        "WHERE length(created_at) = 19"
+    ))
+    db.commit()
+
+
+def migrate(engine):
+    models.Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine, Notification.__table__)
+    _add_missing_columns(engine, AutonomousResult.__table__)
+
+    inspector = inspect(engine)
+    indexes = {
+        table.name: {index["name"] for index in inspector.get_indexes(table.name)}
+        for table in (Result.__table__, InternalMark.__table__, AutonomousResult.__table__)
+    }
+    _drop_obsolete_indexes(engine, indexes)
+
+    with Session(engine) as db:
+        # Databases from before student_summary existed get backfilled once
+        needs_summary = db.scalar(select(StudentSummary.htno).limit(1)) is None and \
+            db.scalar(select(Result.id).limit(1)) is not None
+
+        # Duplicates can only exist until the unique index is built; skip the full scans after
+        if "ux_results_attempt" not in indexes["results"]:
+            _dedupe_results(db)
+        if "ux_internal_marks_subject" not in indexes["internal_marks"]:
+            _dedupe_internal_marks(db)
+        if "ux_autonomous_attempt" not in indexes["autonomous_results"]:
+            _dedupe_autonomous_results(db)
+        _normalize_notification_timestamps(db)
+        if needs_summary:
+            print(f"📈 Built summaries for {summary.rebuild(db)} students")
+
+    for table in (Result.__table__, InternalMark.__table__, Notification.__table__, AutonomousResult.__table__):
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    import database
+
+    migrate(database.engine)
+    print("✅ Schema up to date")
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, func
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Text, func
 from database import Base
 
 # -----------------------------
@@ -8,15 +10,28 @@ class Result(Base):
     __tablename__ = "results"
 
     id = Column(Integer, primary_key=True, index=True)
-    htno = Column(String, index=True)
-    subcode = Column(String)
-    subname = Column(String)
+    # VARCHAR lengths are required on MySQL; HTNOs are 10 characters, subject codes 6-8.
+    # No index of its own: both indexes below lead with htno
+    htno = Column(String(20))
+    subcode = Column(String(20))
+    subname = Column(String(255))
     internals = Column(Integer)
-    grade = Column(String)
+    grade = Column(String(10))
     credits = Column(Float)
     year = Column(Integer)
     semester = Column(Integer)
-    exam_type = Column(String)
+    exam_type = Column(String(20))
+
+    __table_args__ = (
+        # One row per attempt; also lets the database reject duplicate uploads
+        Index(
+            "ux_results_attempt",
+            "htno", "subcode", "semester", "year", "exam_type",
+            unique=True,
+        ),
+        # Covers the CGPA range scans and summary refresh without touching the table
+        Index("ix_results_htno_cgpa", "htno", "subcode", "grade", "credits", "semester"),
+    )
 
 # -----------------------------
 # 🛡️ Admin User Model
@@ -25,8 +40,8 @@ class AdminUser(Base):
     __tablename__ = "admin_users"
 
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, index=True)
-    password = Column(String)
+    username = Column(String(50), unique=True, index=True)
+    password = Column(String(255))
 
 # -----------------------------
 # 🏫 Autonomous Result Model
@@ -35,10 +50,22 @@ class AutonomousResult(Base):
     __tablename__ = "autonomous_results"
 
     id = Column(Integer, primary_key=True, index=True)
-    htno = Column(String, index=True)
-    subcode = Column(String)
-    subname = Column(String, default="")
-    grade = Column(String)
+    # Served by the htno-led indexes below, like results
+    htno = Column(String(20))
+    subcode = Column(String(20))
+    subname = Column(String(255), default="")
+    grade = Column(String(10))
+    # Nullable: rows stored before autonomous uploads existed have neither
+    credits = Column(Float, nullable=True)
+    year = Column(Integer, nullable=True)
+    semester = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        # One row per exam; re-uploads are matched on it
+        Index("ux_autonomous_attempt", "htno", "subcode", "semester", "year", unique=True),
+        # Same covering index as results for the CGPA kernel
+        Index("ix_autonomous_htno_cgpa", "htno", "subcode", "grade", "credits", "semester"),
+    )
 
 # -----------------------------
 # 📢 Notification Model
@@ -47,10 +74,18 @@ class Notification(Base):
     __tablename__ = "college_notifications"
 
     id = Column(Integer, primary_key=True, index=True)
-    heading = Column(String, nullable=False)
-    description = Column(String, nullable=False)
-    file_path = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    heading = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    file_path = Column(String(255), nullable=True)
+    thumbnail_path = Column(String(255), nullable=True)
+    compressed_path = Column(String(255), nullable=True)
+    # Python-side default keeps sub-second precision on SQLite for stable cursors
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        # Feed order and keyset pagination cursor
+        Index("ix_notifications_feed", "created_at", "id"),
+    )
 
 # -----------------------------
 # 📝 Internal Marks Model
@@ -59,7 +94,82 @@ class InternalMark(Base):
     __tablename__ = "internal_marks"
 
     id = Column(Integer, primary_key=True, index=True)
-    htno = Column(String, index=True)
-    subject_code = Column(String)
-    subject_name = Column(String)
+    # Served by the htno-led unique index below
+    htno = Column(String(20))
+    subject_code = Column(String(20))
+    subject_name = Column(String(255))
     marks = Column(Integer)
+
+    __table_args__ = (
+        Index("ux_internal_marks_subject", "htno", "subject_code", unique=True),
+    )
+
+# -----------------------------
+# 📈 Student CGPA Summary (materialized from results)
+# -----------------------------
+class StudentSummary(Base):
+    __tablename__ = "student_summary"
+
+    htno = Column(String(20), primary_key=True)
+    total_credits = Column(Float, default=0.0)
+    total_grade_points = Column(Float, default=0.0)
+    backlogs = Column(Integer, default=0, index=True)
+    cgpa = Column(Float, default=0.0, index=True)
+
+class SemesterSummary(Base):
+    __tablename__ = "student_semester_summary"
+
+    htno = Column(String(20), primary_key=True)
+    semester = Column(Integer, primary_key=True)
+    credits = Column(Float, default=0.0)
+    grade_points = Column(Float, default=0.0)
+    backlogs = Column(Integer, default=0)
+    sgpa = Column(Float, default=0.0)
+
+# -----------------------------
+# 🧾 Ingested Upload Record (content-hash dedup)
+# -----------------------------
+class IngestedUpload(Base):
+    __tablename__ = "ingested_uploads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False)
+    year = Column(Integer)
+    semester = Column(Integer)
+    exam_type = Column(String(20))
+    total_results = Column(Integer)
+    unique_students = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ux_ingested_uploads", "content_hash", "year", "semester", "exam_type", unique=True),
+    )
+
+# -----------------------------
+# ⏳ Upload Job (shared by every API worker process)
+# -----------------------------
+class UploadJob(Base):
+    __tablename__ = "upload_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(20), nullable=False)
+    status = Column(String(10), nullable=False)
+    error = Column(Text, nullable=True)
+    # Epoch seconds; heartbeat_at moves on progress so dead workers' jobs can be expired
+    created_at = Column(Float, nullable=False)
+    heartbeat_at = Column(Float, nullable=False)
+    finished_at = Column(Float, nullable=True)
+    total_pages = Column(Integer, default=0)
+    pages_processed = Column(Integer, default=0)
+    rows_inserted = Column(Integer, default=0)
+    rows_updated = Column(Integer, default=0)
+    duplicates_skipped = Column(Integer, default=0)
+    supply_upgrades = Column(Integer, default=0)
+    # JSON documents
+    result = Column(Text, nullable=True)
+    timings = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Pending-cap count and expiry sweeps
+        Index("ix_upload_jobs_status", "status", "heartbeat_at"),
+    )
@@ -0,0 +1,64 @@
+"""
+Cached pages of the notifications feed with strong ETags.
+
+Pages are keyed by (cursor, limit) and hold the serialized body plus its ETag,
+so a poll with a matching If-None-Match is answered without touching the
+database. Create/delete invalidate everything; the TTL bounds staleness in
+other worker processes.
+"""
+import base64
+import hashlib
+import os
+import threading
+from datetime import datetime
+
+from cachetools import TTLCache
+
+FEED_CACHE_PAGES = int(os.getenv("NOTIFICATION_FEED_CACHE_PAGES", "64"))
+FEED_CACHE_TTL = int(os.getenv("NOTIFICATION_FEED_CACHE_TTL", "30"))
+
+_pages = TTLCache(maxsize=FEED_CACHE_PAGES, ttl=FEED_CACHE_TTL)
+_lock = threading.Lock()
+_generation = 0
+
+
+def encode_cursor(created_at: datetime, notification_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{notification_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id); raises ValueError on a malformed cursor."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, notification_id = base64.urlsafe_b64decode(padded).decode().split("|")
+    return datetime.fromisoformat(created_at), int(notification_id)
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def get(key):
+    """Return (page, generation); page is (body, etag, next_cursor) or None."""
+    with _lock:
+        return _pages.get(key), _generation
+
+
+def put(key, page, generation: int):
+    with _lock:
+        if generation == _generation:
+            _pages[key] = page
+
+
+def invalidate():
+    global _generation
+    with _lock:
+        _generation += 1
+        _pages.clear()
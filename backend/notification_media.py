@@ -0,0 +1,87 @@
+"""
+Image variants for notification attachments.
+
+Phone photos are multi-MB, so after upload a background thread writes a small
+thumbnail and a compressed display copy next to the original and records
+their URLs on the notification row.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+from sqlalchemy import update
+
+import database
+import notification_feed
+from models import Notification
+
+MEDIA_WORKERS = int(os.getenv("NOTIFICATION_MEDIA_WORKERS", "2"))
+VARIANTS = {
+    # name: (max edge in px, JPEG quality)
+    "thumb": (int(os.getenv("NOTIFICATION_THUMB_PX", "320")), 75),
+    "medium": (int(os.getenv("NOTIFICATION_MEDIUM_PX", "1280")), 82),
+}
+
+_executor = ThreadPoolExecutor(max_workers=MEDIA_WORKERS, thread_name_prefix="notification-media")
+
+
+def variant_paths(file_path: str):
+    """URL paths of every variant derived from an attachment's URL path."""
+    stem, _ = os.path.splitext(file_path)
+    return {name: f"{stem}_{name}.jpg" for name in VARIANTS}
+
+
+def _disk_path(url_path: str) -> str:
+    return url_path.lstrip("/")
+
+
+def _render(disk_path: str, file_path: str):
+    written = {}
+    with Image.open(disk_path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for name, url_path in variant_paths(file_path).items():
+            max_edge, quality = VARIANTS[name]
+            variant = image.copy()
+            variant.thumbnail((max_edge, max_edge))
+            variant.save(_disk_path(url_path), "JPEG", quality=quality, optimize=True, progressive=True)
+            written[name] = url_path
+    return written
+
+
+def process(notification_id: int, file_path: str):
+    try:
+        written = _render(_disk_path(file_path), file_path)
+    except (OSError, Image.DecompressionBombError) as e:
+        # Not an image (e.g. a PDF notice) or unreadable; serve the original only
+        print(f"⚠️ No variants for notification {notification_id}: {e}")
+        return
+
+    db = database.SessionLocal()
+    try:
+        updated = db.execute(
+            update(Notification)
+            .where(Notification.id == notification_id)
+            .values(thumbnail_path=written["thumb"], compressed_path=written["medium"])
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+
+    if not updated:
+        # Deleted while we were rendering
+        remove_files(file_path)
+        return
+    notification_feed.invalidate()
+
+
+def submit(notification_id: int, file_path: str):
+    _executor.submit(process, notification_id, file_path)
+
+
+def remove_files(file_path: str):
+    """Delete the original attachment and every variant that exists."""
+    for url_path in [file_path, *variant_paths(file_path).values()]:
+        try:
+            os.remove(_disk_path(url_path))
+        except FileNotFoundError:
+            pass
@@ -1,100 +1,493 @@
-import pdfplumber
+import abc
+import bisect
+import contextlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+import result_cache
+import spool
+import summary
+from database import insert_ignore, stream_rows
 from models import Result
+from sqlalchemy import event, select, update
 from sqlalchemy.orm import Session
 
-def parse_pdf_and_store(pdf_path: str, year: int, semester: int, exam_type: str, db: Session):
-    total_results = 0
+# SQLite caps bound parameters per statement; keep IN (...) lists well under it
+KEY_CHUNK = 500
+WRITE_CHUNK = 1000
+
+# Table extraction is CPU-bound, so large PDFs are sharded across processes
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# "pdfplumber", "pymupdf", or "auto" (ruled-grid pages via PyMuPDF, the rest via pdfplumber)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
+
+
+# -----------------------------
+# 📑 Extraction Backends
+# -----------------------------
+class ExtractionBackend(abc.ABC):
+    """
+    Turns a PDF into one raw table per page: a list of rows of cell strings
+    (None for empty cells), header row included, or None when the page has no table.
+    Libraries are imported on first use; they are slow to load.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def open(self, source):
+        """Context manager over the document; source is a path or raw PDF bytes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def page_count(self, doc) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def page_table(self, doc, index: int):
+        raise NotImplementedError
+
+
+class PdfplumberBackend(ExtractionBackend):
+    name = "pdfplumber"
+
+    def open(self, source):
+        import pdfplumber
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return pdfplumber.open(io.BytesIO(source))
+        return pdfplumber.open(source)
+
+    def page_count(self, doc) -> int:
+        return len(doc.pages)
+
+    def page_table(self, doc, index: int):
+        return doc.pages[index].extract_table()
+
+
+# Ruling lines closer than this (points) are treated as the same line
+GRID_SNAP = 1.0
+# Words whose tops differ by more than this start a new line within a cell
+LINE_TOLERANCE = 3.0
+
+
+def _snap(values):
+    snapped = []
+    for value in sorted(values):
+        if not snapped or value - snapped[-1] > GRID_SNAP:
+            snapped.append(value)
+    return snapped
+
+
+def _covers(segments, start: float, end: float) -> bool:
+    """True when the (lo, hi) segments leave no gap in [start, end]."""
+    reach = start
+    for lo, hi in sorted(segments):
+        if lo > reach + GRID_SNAP:
+            return False
+        reach = max(reach, hi)
+    return reach >= end - GRID_SNAP
+
+
+def _ruled_grid(page):
+    """
+    Column x and row y boundaries when the page's rulings form one complete
+    grid (every line spans the whole table, so no merged cells), else None.
+    """
+    horizontal, vertical = [], []
+    for path in page.get_drawings():
+        for item in path["items"]:
+            if item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+            elif item[0] == "re":
+                x0, y0, x1, y1 = item[1]
+                if y1 - y0 > 2 and x1 - x0 > 2:
+                    # Outlined box: its four edges are rulings
+                    horizontal += [(y0, min(x0, x1), max(x0, x1)), (y1, min(x0, x1), max(x0, x1))]
+                    vertical += [(x0, min(y0, y1), max(y0, y1)), (x1, min(y0, y1), max(y0, y1))]
+                    continue
+            else:
+                return None
+            if abs(y1 - y0) <= 2:
+                horizontal.append(((y0 + y1) / 2, min(x0, x1), max(x0, x1)))
+            elif abs(x1 - x0) <= 2:
+                vertical.append(((x0 + x1) / 2, min(y0, y1), max(y0, y1)))
+            else:
+                return None
+
+    ys = _snap(y for y, _, _ in horizontal)
+    xs = _snap(x for x, _, _ in vertical)
+    if len(ys) < 2 or len(xs) < 2:
+        return None
+    for lines, positions, start, end in ((horizontal, ys, xs[0], xs[-1]), (vertical, xs, ys[0], ys[-1])):
+        for position in positions:
+            segments = [(lo, hi) for at, lo, hi in lines if abs(at - position) <= GRID_SNAP]
+            if not _covers(segments, start, end):
+                return None
+    return xs, ys
+
+
+def _grid_table(page, xs, ys):
+    """Bucket words into grid cells by their centre, like pdfplumber does with chars."""
+    cells = {}
+    for x0, y0, x1, y1, text, *_ in page.get_text("words"):
+        column = bisect.bisect(xs, (x0 + x1) / 2) - 1
+        row = bisect.bisect(ys, (y0 + y1) / 2) - 1
+        if 0 <= column < len(xs) - 1 and 0 <= row < len(ys) - 1:
+            cells.setdefault((row, column), []).append((y0, x0, text))
+
+    table = []
+    for row in range(len(ys) - 1):
+        values = []
+        for column in range(len(xs) - 1):
+            lines = []
+            for top, _, text in sorted(cells.get((row, column), ())):
+                if lines and top - lines[-1][0] <= LINE_TOLERANCE:
+                    lines[-1][1].append(text)
+                else:
+                    lines.append((top, [text]))
+            values.append("\n".join(" ".join(words) for _, words in lines))
+        table.append(values)
+    return table
+
+
+class PyMuPDFBackend(ExtractionBackend):
+    """
+    Fully ruled grids (the 6/7-column result layout) are read straight from the
+    page's drawings and words; anything else, e.g. merged header cells, goes
+    through PyMuPDF's general find_tables().
+    """
+
+    name = "pymupdf"
+
+    def open(self, source):
+        import pymupdf  # type: ignore
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return pymupdf.open(stream=bytes(source), filetype="pdf")
+        return pymupdf.open(source)
+
+    def page_count(self, doc) -> int:
+        return doc.page_count
+
+    def page_table(self, doc, index: int):
+        page = doc[index]
+        grid = _ruled_grid(page)
+        if grid:
+            return _grid_table(page, *grid)
+
+        tables = page.find_tables().tables
+        if not tables:
+            return None
+        # Same pick as pdfplumber's extract_table(): the table with the most cells
+        return max(tables, key=lambda table: table.row_count * table.col_count).extract()
+
+
+class _AutoDocument:
+    def __init__(self, source, stack, pymupdf_doc):
+        self.source = source
+        self.stack = stack
+        self.pymupdf = pymupdf_doc
+        self.pdfplumber = None
+
+
+class AutoBackend(ExtractionBackend):
+    """
+    Pages that form a complete ruled grid take PyMuPDF's fast path; otherwise
+    pdfplumber, which beats find_tables() on the university's merged-cell
+    layout. A document's layout doesn't change between pages, so after the
+    first page that isn't a grid the rest go to pdfplumber without probing.
+    """
+
+    name = "auto"
+
+    @contextlib.contextmanager
+    def open(self, source):
+        with contextlib.ExitStack() as stack:
+            yield _AutoDocument(source, stack, stack.enter_context(BACKENDS["pymupdf"].open(source)))
+
+    def page_count(self, doc) -> int:
+        return doc.pymupdf.page_count
+
+    def page_table(self, doc, index: int):
+        pdfplumber = BACKENDS["pdfplumber"]
+        if doc.pdfplumber is None:
+            page = doc.pymupdf[index]
+            grid = _ruled_grid(page)
+            if grid:
+                return _grid_table(page, *grid)
+            doc.pdfplumber = doc.stack.enter_context(pdfplumber.open(doc.source))
+        return pdfplumber.page_table(doc.pdfplumber, index)
+
+
+BACKENDS = {backend.name: backend for backend in (PdfplumberBackend(), PyMuPDFBackend(), AutoBackend())}
+
+
+def get_backend(name: str = None) -> ExtractionBackend:
+    name = name or PDF_BACKEND
+    if name == "auto" and not importlib.util.find_spec("pymupdf"):
+        name = "pdfplumber"
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF backend: {name}")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    One pool of PDF_WORKERS processes shared by every upload job in this process.
+    Workers come from a forkserver (spawn where unavailable), never a fork of
+    this multi-threaded server, so they can't inherit a lock another thread held.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker died) so the next upload starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _extract_page(backend: ExtractionBackend, doc, index: int):
+    with metrics.span("extract_page"):
+        table = backend.page_table(doc, index)
+    if not table:
+        return []
+
+    rows = []
+    with metrics.span("normalize_rows"):
+        for row in table[1:]:  # Skip header
+            parsed = normalize_row(row)
+            if parsed:
+                rows.append(parsed)
+    return rows
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int, backend_name: str):
+    """
+    Extract and normalize rows for pages [start, end). Runs inside pool workers,
+    so the timing spans travel back with the rows; only the parent records them.
+    """
+    backend = get_backend(backend_name)
+    rows = []
+    with metrics.trace(publish=False) as spans, backend.open(pdf_path) as doc:
+        for index in range(start, end):
+            rows.extend(_extract_page(backend, doc, index))
+    return rows, spans
+
+
+def _extract_in_pool(pdf_path: str, total_pages: int, on_pages, backend: ExtractionBackend):
+    ranges = [
+        (start, min(start + PAGES_PER_TASK, total_pages))
+        for start in range(0, total_pages, PAGES_PER_TASK)
+    ]
+    pool = _get_pool()
+    try:
+        # map() hands results back in submission order, i.e. page order
+        results = pool.map(
+            _extract_page_range,
+            [pdf_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [backend.name] * len(ranges),
+        )
+        for (_, end), (rows, spans) in zip(ranges, results):
+            metrics.record(spans)
+            yield from rows
+            if on_pages:
+                on_pages(end, total_pages)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def extract_rows(pdf_path, workers: int = PDF_WORKERS, on_pages=None, backend: str = None):
+    """
+    Yield normalized (htno, subcode, subname, internals, grade, credits) rows in page order.
+    pdf_path may also be raw PDF bytes; when the pool applies they are spilled
+    to a spool file for the workers to open.
+    on_pages(done, total) is called as pages finish, for upload progress.
+    backend names an extraction backend; None uses PDF_BACKEND.
+    With workers > 1, large PDFs go to the shared pool of PDF_WORKERS processes.
+    """
+    backend = get_backend(backend)
+    with backend.open(pdf_path) as doc:
+        total_pages = backend.page_count(doc)
+
+        if workers <= 1 or total_pages < PARALLEL_MIN_PAGES:
+            for index in range(total_pages):
+                yield from _extract_page(backend, doc, index)
+                if on_pages:
+                    on_pages(index + 1, total_pages)
+            return
+
+    if isinstance(pdf_path, str):
+        yield from _extract_in_pool(pdf_path, total_pages, on_pages, backend)
+        return
+    # Uploads under SPOOL_MEMORY_LIMIT arrive as bytes; workers need a file to open
+    path = spool.spill(bytes(pdf_path))
+    try:
+        yield from _extract_in_pool(path, total_pages, on_pages, backend)
+    finally:
+        os.remove(path)
+
+
+def normalize_row(row):
+    if len(row) == 7:
+        _, htno, subcode, subname, internals, grade, credits = row
+    elif len(row) == 6:
+        htno, subcode, subname, internals, grade, credits = row
+    else:
+        return None
+
+    if not htno or not subcode:
+        return None
+
+    try:
+        return (
+            htno.strip(),
+            subcode.strip(),
+            subname.strip(),
+            0 if internals.strip().upper() == "ABSENT" else int(internals),
+            grade.strip().upper(),
+            float(credits),
+        )
+    except Exception as e:
+        print(f"⚠️ Error while processing row: {e} | Row: {row}")
+        return None
+
+
+def existing_rows_query(htnos, year: int, semester: int):
+    """Stored attempts of the given HTNOs in one exam, for duplicate resolution."""
+    return select(Result.id, Result.htno, Result.subcode, Result.exam_type, Result.grade).where(
+        Result.semester == semester,
+        Result.year == year,
+        Result.htno.in_(htnos),
+    )
+
+
+def _load_existing(db: Session, htnos, year: int, semester: int):
+    """Map (htno, subcode, exam_type) -> (id, grade) for rows already stored."""
+    existing = {}
+    htnos = list(htnos)
+    for i in range(0, len(htnos), KEY_CHUNK):
+        rows = stream_rows(db, existing_rows_query(htnos[i:i + KEY_CHUNK], year, semester))
+        for row_id, htno, subcode, row_exam_type, grade in rows:
+            existing[(htno, subcode, row_exam_type)] = (row_id, grade)
+    return existing
+
+
+def store_rows(rows, year: int, semester: int, exam_type: str, db: Session):
+    """
+    Resolve duplicates and supply upgrades in memory, then write in bulk and
+    refresh the touched summaries. The caller commits, so an upload's rows and
+    its ingest record land together.
+    """
+    rows = list(rows)
+    with metrics.span("db_lookup"):
+        existing = _load_existing(db, {r[0] for r in rows}, year, semester)
+
+    is_supply = exam_type.lower() == "supply"
+    if is_supply:
+        exam_type = "Supply"
+
+    inserts = []
+    upgrades = {}
+    duplicates = 0
     unique_htnos = set()
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            table = page.extract_table()
-            if not table:
+    for htno, subcode, subname, internals, grade, credits in rows:
+        # ✅ Supply upload logic: a pass overwrites the failed regular attempt
+        if is_supply and grade != "F":
+            failed_regular = existing.get((htno, subcode, "Regular"))
+            if failed_regular and failed_regular[1] == "F":
+                row_id = failed_regular[0]
+                upgrades[row_id] = {
+                    "id": row_id,
+                    "grade": grade,
+                    "internals": internals,
+                    "credits": credits,
+                }
+                existing[(htno, subcode, "Regular")] = (row_id, grade)
+                unique_htnos.add(htno)
                 continue
 
-            for row in table[1:]:  # Skip header
-                if len(row) == 7:
-                    _, htno, subcode, subname, internals, grade, credits = row
-                elif len(row) == 6:
-                    htno, subcode, subname, internals, grade, credits = row
-                else:
-                    continue
+        key = (htno, subcode, exam_type)
+        if key in existing:
+            duplicates += 1
+            continue
 
-                if not htno or not subcode:
-                    continue
+        existing[key] = (None, grade)
+        inserts.append({
+            "htno": htno,
+            "subcode": subcode,
+            "subname": subname,
+            "internals": internals,
+            "grade": grade,
+            "credits": credits,
+            "semester": semester,
+            "year": year,
+            "exam_type": exam_type,
+        })
+        unique_htnos.add(htno)
 
-                try:
-                    htno = htno.strip()
-                    subcode = subcode.strip()
-                    subname = subname.strip()
-                    grade = grade.strip().upper()
-                    credits = float(credits)
-                    internals = 0 if internals.strip().upper() == "ABSENT" else int(internals)
-
-                    original_exam_type = exam_type  # Store original for supply logic
-
-                    # ✅ Supply upload logic
-                    if exam_type.lower() == "supply":
-                        if grade != "F":
-                            # Try updating failed regular
-                            failed_regular = db.query(Result).filter(
-                                Result.htno == htno,
-                                Result.subcode == subcode,
-                                Result.semester == semester,
-                                Result.year == year,
-                                Result.exam_type == "Regular",
-                                Result.grade == "F"
-                            ).first()
-
-                            if failed_regular:
-                                print(f"🔁 Updating failed regular: {htno} - {subcode}")
-                                failed_regular.grade = grade
-                                failed_regular.internals = internals
-                                failed_regular.credits = credits
-                                db.add(failed_regular)
-                                total_results += 1
-                                unique_htnos.add(htno)
-                                continue
-
-                        # No failed regular or still failed in supply — store as supply
-                        exam_type = "Supply"
-
-                    # ✅ Now check if record already exists (with updated exam_type)
-                    existing = db.query(Result).filter(
-                        Result.htno == htno,
-                        Result.subcode == subcode,
-                        Result.semester == semester,
-                        Result.year == year,
-                        Result.exam_type == exam_type
-                    ).first()
-
-                    if existing:
-                        print(f"⚠️ Duplicate entry exists: {htno}-{subcode}-{semester}-{year}-{exam_type}")
-                        continue
-
-                    # ✅ Insert result
-                    db_result = Result(
-                        htno=htno,
-                        subcode=subcode,
-                        subname=subname,
-                        internals=internals,
-                        grade=grade,
-                        credits=credits,
-                        semester=semester,
-                        year=year,
-                        exam_type=exam_type
-                    )
-
-                    db.add(db_result)
-                    total_results += 1
-                    unique_htnos.add(htno)
-
-                except Exception as e:
-                    print(f"⚠️ Error while processing row: {e} | Row: {row}")
-                    continue
+    # The unique attempt index backs up the in-memory check against concurrent uploads
+    insert_stmt = insert_ignore(Result)
+    with metrics.span("db_write"):
+        for i in range(0, len(inserts), WRITE_CHUNK):
+            db.execute(insert_stmt, inserts[i:i + WRITE_CHUNK])
+        if upgrades:
+            db.execute(update(Result), list(upgrades.values()))
+    if unique_htnos:
+        with metrics.span("summary_refresh"):
+            summary.refresh_students(db, unique_htnos)
+    # Dropped only once committed, so a reader can't re-cache the old rows in between
+    event.listen(db, "after_commit", lambda session: result_cache.invalidate(unique_htnos), once=True)
+
+    if duplicates:
+        print(f"⚠️ Skipped {duplicates} duplicate entries for semester {semester}, {year} ({exam_type})")
+    if upgrades:
+        print(f"🔁 Updated {len(upgrades)} failed regular results from supply")
 
-    db.commit()
     return {
-        "total_results": total_results,
-        "unique_students": len(unique_htnos)
+        "total_results": len(inserts) + len(upgrades),
+        "unique_students": len(unique_htnos),
+        "inserted": len(inserts),
+        "upgraded": len(upgrades),
+        "duplicates": duplicates,
     }
+
+
+def parse_pdf_and_store(pdf_path: str, year: int, semester: int, exam_type: str, db: Session,
+                        workers: int = PDF_WORKERS, on_pages=None, backend: str = None):
+    stats = store_rows(extract_rows(pdf_path, workers, on_pages, backend), year, semester, exam_type, db)
+    db.commit()
+    return stats
@@ -0,0 +1,71 @@
+"""
+Batch /get_results/batch lookups: results (and optionally internal marks) for a
+whole section in one indexed IN query per table, grouped per student.
+
+Payloads are plain dicts/lists built straight from row tuples, so JSON and
+MessagePack are encoded from the same structure without per-row model
+validation.
+"""
+import os
+
+import msgpack
+from pydantic_core import to_json
+
+# Keeps the IN (...) list in one statement on SQLite, like the ingest KEY_CHUNKs
+BATCH_MAX_HTNOS = int(os.getenv("RESULT_BATCH_MAX_HTNOS", "500"))
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+}
+
+
+class BatchTooLarge(Exception):
+    pass
+
+
+def unique_htnos(htnos):
+    """
+    Upper-cased (HTNOs are upper-case alphanumerics), in request order with
+    duplicates dropped; raises BatchTooLarge past BATCH_MAX_HTNOS.
+    """
+    htnos = list(dict.fromkeys(htno.strip().upper() for htno in htnos if htno and htno.strip()))
+    if len(htnos) > BATCH_MAX_HTNOS:
+        raise BatchTooLarge(f"At most {BATCH_MAX_HTNOS} HTNOs per batch, got {len(htnos)}")
+    return htnos
+
+
+def group(htnos, result_fields, result_rows, internal_fields=None, internal_rows=None):
+    """
+    {"students": [{"htno", "results", ["internals"]}...], "missing": [...]} in
+    htnos order. Rows must carry htno in the field named "htno"; they are
+    matched upper-cased, since a case-insensitive collation (MySQL's default)
+    returns the stored spelling rather than the requested one.
+    """
+    students = {htno: {"htno": htno, "results": []} for htno in htnos}
+    if internal_fields is not None:
+        for student in students.values():
+            student["internals"] = []
+
+    index = result_fields.index("htno")
+    for row in result_rows:
+        students[row[index].upper()]["results"].append(dict(zip(result_fields, row)))
+    if internal_fields is not None:
+        index = internal_fields.index("htno")
+        for row in internal_rows:
+            students[row[index].upper()]["internals"].append(dict(zip(internal_fields, row)))
+
+    found = []
+    missing = []
+    for htno, student in students.items():
+        if student["results"] or student.get("internals"):
+            found.append(student)
+        else:
+            missing.append(htno)
+    return {"students": found, "missing": missing}
+
+
+def encode(payload, fmt: str) -> bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True)
+    return to_json(payload)
@@ -0,0 +1,78 @@
+"""
+In-process cache of serialized /get_result/{htno} responses.
+
+Entries are bounded by RESULT_CACHE_SIZE and expire after RESULT_CACHE_TTL
+seconds; ingestion invalidates the HTNOs it touches. With several workers the
+TTL bounds how stale another process's copy can get.
+"""
+import os
+import threading
+
+from cachetools import TTLCache
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "600"))
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts capacity evictions (popitem is only called when full)."""
+
+    evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+_cache = _CountingTTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+_lock = threading.Lock()
+_generation = 0
+hits = 0
+misses = 0
+
+
+def get(htno: str):
+    """Return (cached_bytes, generation); pass generation back to put()."""
+    global hits, misses
+    with _lock:
+        body = _cache.get(htno)
+        if body is None:
+            misses += 1
+        else:
+            hits += 1
+        return body, _generation
+
+
+def put(htno: str, body: bytes, generation: int):
+    # Skip the store if an ingest invalidated anything while the caller was reading
+    with _lock:
+        if generation == _generation:
+            _cache[htno] = body
+
+
+def invalidate(htnos):
+    global _generation
+    with _lock:
+        _generation += 1
+        for htno in htnos:
+            _cache.pop(htno, None)
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+
+
+def stats():
+    with _lock:
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": _cache.evictions,
+            "size": _cache.currsize,
+            "maxsize": _cache.maxsize,
+            "ttl": RESULT_CACHE_TTL,
+        }
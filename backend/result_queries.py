@@ -0,0 +1,54 @@
+"""
+Read-path selects for the result endpoints, built here so the API and the
+query-plan check (benchmarks/check_query_plans.py) run the same SQL.
+
+Columns come from the response schemas, never whole ORM entities.
+"""
+from sqlalchemy import select
+
+import schemas
+from models import AutonomousResult, InternalMark, Result
+
+RESULT_FIELDS = tuple(schemas.ResultOut.model_fields)
+INTERNAL_FIELDS = tuple(schemas.InternalMarkOut.model_fields)
+AUTONOMOUS_FIELDS = tuple(schemas.AutonomousResultOut.model_fields)
+
+_result_columns = select(*(getattr(Result, name) for name in RESULT_FIELDS))
+_internal_columns = select(*(getattr(InternalMark, name) for name in INTERNAL_FIELDS))
+_autonomous_columns = select(*(getattr(AutonomousResult, name) for name in AUTONOMOUS_FIELDS))
+
+
+def result_query(htno: str):
+    """/get_result/{htno}."""
+    return _result_columns.where(Result.htno == htno)
+
+
+def batch_results_query(htnos):
+    """/get_results/batch results, grouped per student in insertion order."""
+    return _result_columns.where(Result.htno.in_(htnos)).order_by(Result.htno, Result.id)
+
+
+def batch_internals_query(htnos):
+    return _internal_columns.where(InternalMark.htno.in_(htnos)).order_by(InternalMark.htno, InternalMark.id)
+
+
+def range_htnos_query(start_htno: str, end_htno: str, limit: int):
+    """Distinct HTNOs in the range; walks the htno-led index and stops at limit."""
+    return (
+        select(Result.htno).distinct()
+        .where(Result.htno.between(start_htno, end_htno))
+        .order_by(Result.htno).limit(limit)
+    )
+
+
+def autonomous_result_query(htno: str):
+    # Keyed on the unique exam index, which leads with htno
+    return (
+        _autonomous_columns.where(AutonomousResult.htno == htno)
+        .order_by(AutonomousResult.semester, AutonomousResult.subcode)
+    )
+
+
+def autonomous_htnos_query():
+    # DISTINCT over an htno-led index; never loads the rows themselves
+    return select(AutonomousResult.htno).distinct().order_by(AutonomousResult.htno)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from datetime import datetime
 from enum import Enum
 
@@ -11,6 +11,35 @@ class ExamTypeEnum(str, Enum):
     supply = "Supply"
     autonomous = "Autonomous"
 
+# -----------------------------
+# 🔁 Enum for Re-upload Conflict Handling
+# -----------------------------
+class ConflictPolicyEnum(str, Enum):
+    upsert = "upsert"
+    skip = "skip"
+
+# -----------------------------
+# 📤 Enum for Report Export Formats
+# -----------------------------
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# -----------------------------
+# 📦 Enum for Batch Result Encodings
+# -----------------------------
+class ResultFormatEnum(str, Enum):
+    json = "json"
+    msgpack = "msgpack"
+
+# -----------------------------
+# 📑 Enum for Result PDF Extraction Backends
+# -----------------------------
+class PdfBackendEnum(str, Enum):
+    auto = "auto"
+    pdfplumber = "pdfplumber"
+    pymupdf = "pymupdf"
+
 # -----------------------------
 # 📊 Result Output Schema
 # -----------------------------
@@ -43,13 +72,16 @@ class AdminOut(BaseModel):
         orm_mode = True
 
 # -----------------------------
-# 🏫 Autonomous Result (if needed)
+# 🏫 Autonomous Result Output Schema
 # -----------------------------
 class AutonomousResultOut(BaseModel):
     htno: str
-    branch: str
-    subjects: str
-    sgpa: str
+    subcode: str
+    subname: Optional[str] = ""
+    grade: str
+    credits: Optional[float] = None
+    year: Optional[int] = None
+    semester: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -66,6 +98,8 @@ class NotificationOut(BaseModel):
     heading: str
     description: str
     file_path: Optional[str]
+    thumbnail_path: Optional[str] = None
+    compressed_path: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -82,6 +116,34 @@ class StudentCGPA(BaseModel):
 class CGPAResponse(BaseModel):
     report: List[StudentCGPA]
 
+# -----------------------------
+# 📊 Cohort Analytics Schemas
+# -----------------------------
+class SubjectStats(BaseModel):
+    subcode: str
+    subname: str
+    students: int
+    passed: int
+    pass_rate: float
+    mean_grade_points: float
+    grade_distribution: Dict[str, int]
+
+class CohortReport(BaseModel):
+    rows: int
+    students: int
+    pass_rate: float
+    subjects: List[SubjectStats]
+    toppers: List[StudentCGPA]
+
+class StudentSGPA(BaseModel):
+    htno: str
+    semester: int
+    sgpa: float
+    backlogs: int
+
+class SGPAResponse(BaseModel):
+    report: List[StudentSGPA]
+
 # -----------------------------
 # 📝 Internal Marks Schema
 # -----------------------------
@@ -93,3 +155,22 @@ class InternalMarkOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+# -----------------------------
+# 📦 Batch Result Lookup Schemas
+# -----------------------------
+class BatchResultRequest(BaseModel):
+    # Either a list of HTNOs or an inclusive start/end range
+    htnos: Optional[List[str]] = None
+    start_htno: Optional[str] = None
+    end_htno: Optional[str] = None
+    include_internals: bool = False
+
+class StudentResults(BaseModel):
+    htno: str
+    results: List[ResultOut]
+    internals: Optional[List[InternalMarkOut]] = None
+
+class BatchResultResponse(BaseModel):
+    students: List[StudentResults]
+    missing: List[str]
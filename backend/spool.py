@@ -0,0 +1,201 @@
+"""
+Upload spooling: small uploads stay in memory, larger ones go to a uniquely
+named file under SPOOL_DIR.
+
+UPLOAD_MAX_BYTES is enforced twice. UploadSizeLimitMiddleware rejects a
+request body past it (plus multipart framing) from Content-Length or as the
+body streams in, before Starlette parses the form into its own temp files.
+receive() and save_to() then apply the exact per-file limit while copying;
+an accepted file is still written twice, to Starlette's temp file and here.
+
+Spool files carry the owning PID in their name so files left behind by a
+crashed worker are swept by cleanup_stale() on the next startup.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+import uuid
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+SPOOL_MEMORY_LIMIT = int(os.getenv("SPOOL_MEMORY_LIMIT", str(4 * 1024 * 1024)))
+SPOOL_DIR = os.getenv("SPOOL_DIR", os.path.join(tempfile.gettempdir(), "result-analysis-uploads"))
+SPOOL_STALE_SECONDS = int(os.getenv("SPOOL_STALE_SECONDS", str(6 * 3600)))
+COPY_CHUNK = 1024 * 1024
+# Room for multipart boundaries, headers and form fields around the file
+MULTIPART_SLACK = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class SpooledUpload:
+    """A fully received upload: either in-memory bytes or a spool file path."""
+
+    def __init__(self, data: bytes = None, path: str = None, size: int = 0, content_hash: str = ""):
+        self.data = data
+        self.path = path
+        self.size = size
+        self.content_hash = content_hash
+
+    @property
+    def source(self):
+        """What to hand to pdfplumber/PyMuPDF: the bytes, or the spool file path."""
+        return self.data if self.data is not None else self.path
+
+    def close(self):
+        self.data = None
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def _spool_path() -> str:
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    return os.path.join(SPOOL_DIR, f"{os.getpid()}_{uuid.uuid4().hex}.upload")
+
+
+def receive(src, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """Read file object src, hashing as it streams; raises UploadTooLarge past max_bytes."""
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    spool_file = None
+    path = None
+    size = 0
+
+    try:
+        while True:
+            chunk = src.read(COPY_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+
+            if spool_file is None and size > SPOOL_MEMORY_LIMIT:
+                path = _spool_path()
+                spool_file = open(path, "wb")
+                spool_file.write(buffer.getbuffer())
+                buffer = None
+            if spool_file is not None:
+                spool_file.write(chunk)
+            else:
+                buffer.write(chunk)
+    except BaseException:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(path)
+        raise
+
+    if spool_file is not None:
+        spool_file.close()
+        return SpooledUpload(path=path, size=size, content_hash=digest.hexdigest())
+    return SpooledUpload(data=buffer.getvalue(), size=size, content_hash=digest.hexdigest())
+
+
+def spill(data: bytes) -> str:
+    """
+    Write in-memory upload bytes to a spool file for code that needs a path,
+    e.g. PDF pool workers opening the document themselves. Caller removes it.
+    """
+    path = _spool_path()
+    try:
+        with open(path, "wb") as f:
+            f.write(data)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def save_to(src, dest_path: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+    """Stream src straight to its final location, enforcing max_bytes."""
+    size = 0
+    try:
+        with open(dest_path, "wb") as dst:
+            while True:
+                chunk = src.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                dst.write(chunk)
+    except BaseException:
+        os.remove(dest_path)
+        raise
+    return size
+
+
+class UploadSizeLimitMiddleware:
+    """413 for request bodies larger than max_bytes, before the body is read or spooled."""
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES + MULTIPART_SLACK):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds {UPLOAD_MAX_BYTES} bytes"
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        # Chunked bodies carry no length; count them as they arrive
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_stale():
+    """Remove spool files whose owning process is gone or that outlived SPOOL_STALE_SECONDS."""
+    if not os.path.isdir(SPOOL_DIR):
+        return 0
+
+    removed = 0
+    now = time.time()
+    for name in os.listdir(SPOOL_DIR):
+        path = os.path.join(SPOOL_DIR, name)
+        try:
+            pid = int(name.split("_", 1)[0])
+        except ValueError:
+            continue
+        try:
+            if not _pid_alive(pid) or now - os.path.getmtime(path) > SPOOL_STALE_SECONDS:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
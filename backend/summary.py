@@ -0,0 +1,122 @@
+"""
+Maintains the student_summary / student_semester_summary tables from results
+and autonomous_results.
+
+Rebuild everything from results:  python summary.py --rebuild
+"""
+import argparse
+from itertools import chain
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+import cgpa
+from database import stream_rows
+from models import AutonomousResult, Result, StudentSummary, SemesterSummary
+
+KEY_CHUNK = 500
+WRITE_CHUNK = 1000
+
+# Only the columns the CGPA kernel reads, never whole Result entities
+KERNEL_COLUMNS = select(Result.htno, Result.subcode, Result.grade, Result.credits, Result.semester)
+# Autonomous grades count too; legacy rows without a semester are left out
+AUTONOMOUS_KERNEL_COLUMNS = select(
+    AutonomousResult.htno, AutonomousResult.subcode, AutonomousResult.grade,
+    AutonomousResult.credits, AutonomousResult.semester,
+).where(AutonomousResult.semester.is_not(None))
+
+
+def kernel_queries(htnos=None):
+    """(results, autonomous) selects feeding kernel_rows, ordered by insertion."""
+    results = KERNEL_COLUMNS
+    autonomous = AUTONOMOUS_KERNEL_COLUMNS
+    if htnos is not None:
+        results = results.where(Result.htno.in_(htnos))
+        autonomous = autonomous.where(AutonomousResult.htno.in_(htnos))
+    return results.order_by(Result.id), autonomous.order_by(AutonomousResult.id)
+
+
+def kernel_rows(db: Session, htnos=None):
+    """
+    Kernel rows for the given HTNOs (all when None): results in insertion
+    order, then autonomous results, so a regular attempt stays the first one.
+    """
+    results, autonomous = kernel_queries(htnos)
+    # chain() drains the first cursor before the second query runs
+    return chain(stream_rows(db, results), stream_rows(db, autonomous))
+
+
+def summarize(rows):
+    """
+    rows: (htno, subcode, grade, credits, semester) in insertion order.
+    Returns (student_rows, semester_rows) ready for bulk insert.
+    """
+    student_rows = []
+    semester_rows = []
+    for htno, student in cgpa.aggregate(rows).items():
+        student_rows.append({
+            "htno": htno,
+            "total_credits": student.credits,
+            "total_grade_points": student.points,
+            "backlogs": student.backlogs,
+            "cgpa": student.cgpa,
+        })
+        for semester, (credits, points, backlogs) in student.semesters.items():
+            semester_rows.append({
+                "htno": htno,
+                "semester": semester,
+                "credits": credits,
+                "grade_points": points,
+                "backlogs": backlogs,
+                "sgpa": cgpa.round_gpa(points, credits),
+            })
+
+    return student_rows, semester_rows
+
+
+def _write(db: Session, student_rows, semester_rows):
+    for i in range(0, len(student_rows), WRITE_CHUNK):
+        db.execute(insert(StudentSummary), student_rows[i:i + WRITE_CHUNK])
+    for i in range(0, len(semester_rows), WRITE_CHUNK):
+        db.execute(insert(SemesterSummary), semester_rows[i:i + WRITE_CHUNK])
+
+
+def refresh_students(db: Session, htnos):
+    """Recompute summaries for the given HTNOs. Does not commit."""
+    htnos = list(htnos)
+    for i in range(0, len(htnos), KEY_CHUNK):
+        chunk = htnos[i:i + KEY_CHUNK]
+        student_rows, semester_rows = summarize(kernel_rows(db, chunk))
+
+        db.execute(delete(StudentSummary).where(StudentSummary.htno.in_(chunk)))
+        db.execute(delete(SemesterSummary).where(SemesterSummary.htno.in_(chunk)))
+        _write(db, student_rows, semester_rows)
+
+
+def rebuild(db: Session):
+    """Regenerate both summary tables from scratch."""
+    student_rows, semester_rows = summarize(kernel_rows(db))
+
+    db.execute(delete(StudentSummary))
+    db.execute(delete(SemesterSummary))
+    _write(db, student_rows, semester_rows)
+    db.commit()
+    return len(student_rows)
+
+
+if __name__ == "__main__":
+    import models, database
+
+    parser = argparse.ArgumentParser(description="Student CGPA summary maintenance")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate from results and autonomous results")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        models.Base.metadata.create_all(bind=database.engine)
+        db = database.SessionLocal()
+        try:
+            print(f"✅ Rebuilt summaries for {rebuild(db)} students")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
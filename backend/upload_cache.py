@@ -0,0 +1,62 @@
+"""
+Content-addressed cache of parsed result PDFs.
+
+Rows extracted from a PDF are stored under the SHA-256 of the uploaded bytes,
+so re-uploading the same file (even with a different semester or exam type)
+skips pdfplumber entirely.
+"""
+import json
+import os
+import tempfile
+
+PARSED_CACHE_DIR = os.getenv("PARSED_CACHE_DIR", "uploads/parsed_cache")
+PARSED_CACHE_MAX_FILES = int(os.getenv("PARSED_CACHE_MAX_FILES", "50"))
+
+
+def _path(content_hash: str) -> str:
+    return os.path.join(PARSED_CACHE_DIR, f"{content_hash}.json")
+
+
+def load_rows(content_hash: str):
+    """Return (total_pages, rows) for a previously parsed upload, or None."""
+    try:
+        with open(_path(content_hash)) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached["pages"], [tuple(row) for row in cached["rows"]]
+
+
+def save_rows(content_hash: str, total_pages: int, rows):
+    os.makedirs(PARSED_CACHE_DIR, exist_ok=True)
+    # Write-then-rename so a concurrent reader never sees a partial file; the
+    # temp name is unique so two jobs saving the same upload don't interleave
+    fd, tmp_path = tempfile.mkstemp(dir=PARSED_CACHE_DIR, prefix=f"{content_hash}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"pages": total_pages, "rows": rows}, f)
+        os.replace(tmp_path, _path(content_hash))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _evict()
+
+
+def _evict():
+    # Another job may evict the same files concurrently; vanished entries are skipped
+    entries = []
+    for name in os.listdir(PARSED_CACHE_DIR):
+        if name.endswith(".json"):
+            path = os.path.join(PARSED_CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    if len(entries) <= PARSED_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - PARSED_CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass